@@ -6,176 +6,340 @@ Handles .bat and .cmd file execution
 import os
 import sys
 import re
+import functools
 import subprocess
+from collections import ChainMap, OrderedDict, namedtuple
+from dataclasses import dataclass, field
 from pathlib import Path
 
+# Precompiled pattern for batch variable expansion: %0-%9, %* and %NAME%
+_ALL_RE = re.compile(r'%(?:([0-9*])|([A-Za-z_][A-Za-z0-9_]*)%)')
+
+# Opcodes produced by compile_batch
+(OP_EXEC, OP_DYNAMIC, OP_REM, OP_ECHO, OP_SET, OP_IF, OP_FOR, OP_GOTO,
+ OP_CALL, OP_SHIFT, OP_EXIT, OP_PAUSE, OP_SETLOCAL, OP_ENDLOCAL,
+ OP_JUMP, OP_GOSUB, OP_ERROR) = range(17)
+
+# Batch keywords and the opcodes they compile to
+_KEYWORDS = {
+    'REM': OP_REM, 'ECHO': OP_ECHO, 'SET': OP_SET, 'IF': OP_IF,
+    'FOR': OP_FOR, 'GOTO': OP_GOTO, 'CALL': OP_CALL, 'SHIFT': OP_SHIFT,
+    'EXIT': OP_EXIT, 'PAUSE': OP_PAUSE, 'SETLOCAL': OP_SETLOCAL,
+    'ENDLOCAL': OP_ENDLOCAL,
+}
+
+# Opcodes that never write output; echo lines before them stay buffered
+_SILENT_OPS = frozenset((OP_REM, OP_SHIFT, OP_SETLOCAL, OP_ENDLOCAL))
+
+# Parsed IF condition for text that is not a recognised IF form
+_IF_INVALID = (False, None, None, None)
+
+@functools.lru_cache(maxsize=256)
+def _parse_if(condition):
+    """Parse the text after IF into a (negate, mode, operand, command) tuple.
+    
+    negate is True for IF NOT. mode is 'EXIST' (operand is the file name),
+    'DEFINED' (operand is the variable name), 'ERRORLEVEL' (operand is the
+    level), '==' (operand is the (left, right) pair) or None when nothing
+    matched. Results are cached, so an IF inside a loop is parsed only once.
+    """
+    args = condition.split()
+    
+    # IF NOT inverts whichever condition follows
+    negate = bool(args) and args[0].upper() == 'NOT'
+    if negate:
+        args = args[1:]
+    
+    if len(args) < 2:
+        return _IF_INVALID
+    
+    mode = args[0].upper()
+    if mode == 'EXIST' or mode == 'DEFINED':
+        return (negate, mode, args[1], ' '.join(args[2:]))
+    
+    if mode == 'ERRORLEVEL':
+        try:
+            level = int(args[1])
+        except ValueError:
+            return _IF_INVALID
+        return (negate, mode, level, ' '.join(args[2:]))
+    
+    joined = ' '.join(args)
+    left, found, rest = joined.partition('==')
+    if found:
+        right, _, command = rest.strip().partition(' ')
+        if not right:
+            return _IF_INVALID
+        return (negate, '==', (left.strip().strip('"'), right.strip('"')), command)
+    
+    return _IF_INVALID
+
+# Compiled programs keyed by (abspath, mtime_ns, size), least recently used first
+_PROGRAM_CACHE = OrderedDict()
+_PROGRAM_CACHE_SIZE = 64
+
+@dataclass
+class BatchProgram:
+    """A batch file compiled to a flat instruction list.
+    
+    Each instruction is an (opcode, echo_text, operand) tuple. echo_text is
+    None for @-prefixed lines. Labels map to instruction indices. GOTO and
+    CALL :label with a literal target are resolved to OP_JUMP/OP_GOSUB
+    carrying the index, or to OP_ERROR if the label does not exist.
+    """
+    instructions: list = field(default_factory=list)
+    labels: dict = field(default_factory=dict)
+
+# Execution context handed to every batch command handler
+BatchContext = namedtuple('BatchContext', 'program pc')
+
+def compile_batch(lines):
+    """Compile batch file lines into a BatchProgram"""
+    program = BatchProgram()
+    instructions = program.instructions
+    
+    for line in lines:
+        s = line.lstrip()
+        
+        # Blank lines and :: comments produce no instructions
+        if not s or s[:2] == '::':
+            continue
+        
+        # Labels resolve to the index of the next instruction
+        if s[0] == ':':
+            program.labels[s[1:].strip().upper()] = len(instructions)
+            continue
+        
+        # @ prefix suppresses echo for this command
+        if s[0] == '@':
+            text = s[1:].strip()
+            echo_text = None
+        else:
+            echo_text = line.rstrip()
+            text = s.rstrip()
+        
+        command, _, operand = text.partition(' ')
+        keyword = command.upper()
+        if '%' in command:
+            # Command name depends on a variable - resolve at run time
+            instructions.append((OP_DYNAMIC, echo_text, text))
+        elif keyword in _KEYWORDS:
+            instructions.append((_KEYWORDS[keyword], echo_text, operand))
+        else:
+            instructions.append((OP_EXEC, echo_text, text))
+    
+    # Second pass: resolve literal GOTO / CALL :label targets to indices
+    for i, (op, echo_text, operand) in enumerate(instructions):
+        if op != OP_GOTO and op != OP_CALL:
+            continue
+        
+        target, _, rest = operand.strip().partition(' ')
+        if not target or '%' in target or (op == OP_CALL and target[0] != ':'):
+            continue
+        
+        label = target.lstrip(':').upper()
+        if op == OP_GOTO and label == 'EOF':
+            index = len(instructions)
+        else:
+            index = program.labels.get(label)
+        
+        if index is None:
+            message = f"The system cannot find the batch label specified - {target}"
+            instructions[i] = (OP_ERROR, echo_text, (message, 'EXIT' if op == OP_GOTO else None))
+        elif op == OP_GOTO:
+            instructions[i] = (OP_JUMP, echo_text, index)
+        else:
+            instructions[i] = (OP_GOSUB, echo_text, (index, target, rest))
+    
+    return program
+
 class BatchProcessor:
     """Processes batch files (.bat, .cmd)"""
     
     def __init__(self, command_processor):
         self.command_processor = command_processor
-        self.variables = {}
+        self._scopes = [{}]
+        self._argv = []
+        self._arg_base = 0
+        self._all_args = ''
+        self._cmd_intern = {}
         self.echo_on = True
-        self.goto_labels = {}
-        self.call_stack = []
         
+    @property
+    def variables(self):
+        """Batch variables visible from the innermost scope"""
+        return ChainMap(*reversed(self._scopes))
+    
+    def _get(self, key, default=''):
+        """Look up a batch variable, innermost scope first"""
+        for scope in reversed(self._scopes):
+            if key in scope:
+                return scope[key]
+        return default
+    
+    def _set(self, key, value):
+        """Set a batch variable in the innermost scope"""
+        self._scopes[-1][key] = value
+    
     def execute_batch_file(self, filename, args=None):
         """Execute a batch file"""
         if args is None:
             args = []
-            
+        
         try:
-            with open(filename, 'r', encoding='utf-8', errors='replace') as f:
-                lines = f.readlines()
-                
-            # Parse labels first
-            self.parse_labels(lines)
+            program = self.load_program(filename)
             
             # Set batch parameters
             self.set_batch_parameters(args)
             
-            # Execute lines
-            self.execute_batch_lines(lines, filename)
+            # Execute instructions
+            return self.execute_batch_lines(program, filename)
             
         except FileNotFoundError:
             print(f"The system cannot find the file {filename}.")
         except Exception as e:
             print(f"Error executing batch file: {e}")
     
-    def parse_labels(self, lines):
-        """Parse :label definitions"""
-        self.goto_labels.clear()
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line.startswith(':') and not line.startswith('::'):
-                label = line[1:].strip()
-                self.goto_labels[label.upper()] = i
+    def load_program(self, filename):
+        """Load and compile a batch file, reusing a cached compilation"""
+        st = os.stat(filename)
+        key = (os.path.abspath(filename), st.st_mtime_ns, st.st_size)
+        program = _PROGRAM_CACHE.get(key)
+        if program is not None:
+            _PROGRAM_CACHE.move_to_end(key)
+            return program
+        
+        with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+            program = compile_batch(f.readlines())
+        _PROGRAM_CACHE[key] = program
+        if len(_PROGRAM_CACHE) > _PROGRAM_CACHE_SIZE:
+            _PROGRAM_CACHE.popitem(last=False)
+        return program
     
     def set_batch_parameters(self, args):
         """Set %0, %1, %2, etc. parameters"""
-        # %0 is the batch file name
-        self.variables['0'] = args[0] if args else ''
-        
-        # %1, %2, etc. are the arguments
-        for i, arg in enumerate(args[1:], 1):
-            self.variables[str(i)] = arg
+        # %0 is the batch file name, %1, %2, etc. are the arguments
+        self._argv = list(args)
+        self._arg_base = 0
         
-        # Clear higher numbered parameters
-        for i in range(len(args), 10):
-            self.variables[str(i)] = ''
+        # %* represents all arguments and is not affected by SHIFT
+        self._all_args = ' '.join(args[1:]) if args else ''
+    
+    def _param(self, n):
+        """Get parameter %n, taking SHIFT into account"""
+        i = self._arg_base + n
+        return self._argv[i] if i < len(self._argv) else ''
+    
+    def execute_batch_lines(self, program, filename, start_line=0):
+        """Execute compiled batch instructions
         
-        # %* represents all arguments
-        self.variables['*'] = ' '.join(args[1:]) if args else ''
+        Returns 'EXIT' or 'CALL_RETURN' when execution was ended by
+        an EXIT command, None when the end of the program was reached.
+        """
+        # Echo lines are written in batches rather than one print per line
+        echo_buffer = []
+        try:
+            return self._run(program, start_line, echo_buffer)
+        finally:
+            if echo_buffer:
+                sys.stdout.write(''.join(echo_buffer))
     
-    def execute_batch_lines(self, lines, filename, start_line=0):
-        """Execute batch file lines"""
-        i = start_line
+    def _run(self, program, pc, echo_buffer):
+        """Interpreter loop for execute_batch_lines"""
+        instructions = program.instructions
         
-        while i < len(lines):
-            line = lines[i].rstrip()
-            original_line = line
+        while pc < len(instructions):
+            op, echo_text, operand = instructions[pc]
             
-            # Skip empty lines and comments
-            if not line.strip() or line.strip().startswith('::'):
-                i += 1
-                continue
-            
-            # Handle labels
-            if line.strip().startswith(':'):
-                i += 1
-                continue
+            # Echo the command if echo is on and not suppressed by @
+            if self.echo_on and echo_text is not None:
+                echo_buffer.append(f"C:\\>{echo_text}\n")
             
-            # Handle @ prefix (suppress echo for this command)
-            suppress_echo = False
-            if line.strip().startswith('@'):
-                suppress_echo = True
-                line = line.strip()[1:].strip()
+            # Commands that may print get any pending echo lines first
+            if echo_buffer and op not in _SILENT_OPS:
+                sys.stdout.write(''.join(echo_buffer))
+                echo_buffer.clear()
             
-            # Echo the command if echo is on and not suppressed
-            if self.echo_on and not suppress_echo:
-                print(f"C:\\>{line}")
+            # Resolved jumps, calls and label errors carry no text to expand
+            if op == OP_JUMP:
+                pc = operand
+                continue
+            elif op == OP_GOSUB:
+                index, target, rest = operand
+                if '%' in rest:
+                    rest = self.expand_batch_variables(rest)
+                if self.call_subroutine(program, index, [target] + rest.split()) == 'EXIT':
+                    return 'EXIT'
+                pc += 1
+                continue
+            elif op == OP_ERROR:
+                message, result = operand
+                print(message)
+                if result is not None:
+                    return result
+                pc += 1
+                continue
             
             # Expand variables
-            line = self.expand_batch_variables(line)
+            if '%' in operand:
+                operand = self.expand_batch_variables(operand)
             
-            # Handle batch-specific commands
-            result = self.handle_batch_command(line, lines, i, filename)
+            if op == OP_EXEC:
+                # Regular command - its exit code is not a jump target
+                if self.command_processor.process_command(operand) == 'EXIT':
+                    return 'EXIT'
+                pc += 1
+                continue
+            elif op == OP_DYNAMIC:
+                result = self.handle_batch_command(operand, BatchContext(program, pc))
+            else:
+                result = _OPTABLE[op](self, operand.split(), BatchContext(program, pc))
             
             if isinstance(result, int):
-                # GOTO command returns new line number
-                i = result
+                # GOTO command returns new instruction index
+                pc = result
                 continue
-            elif result == 'EXIT':
-                break
-            elif result == 'CALL_RETURN':
-                break
+            elif result == 'EXIT' or result == 'CALL_RETURN':
+                return result
             
-            i += 1
+            pc += 1
+        
+        return None
     
     def expand_batch_variables(self, line):
         """Expand batch variables like %VAR%, %1, %2, etc."""
-        # Handle %n parameters (0-9)
-        for i in range(10):
-            param = f'%{i}'
-            if param in line:
-                value = self.variables.get(str(i), '')
-                line = line.replace(param, value)
-        
-        # Handle %* (all parameters)
-        if '%*' in line:
-            line = line.replace('%*', self.variables.get('*', ''))
+        if '%' not in line:
+            return line
         
-        # Handle custom variables %VAR%
-        import re
-        pattern = r'%([A-Za-z_][A-Za-z0-9_]*)%'
+        def replace(match):
+            param, var_name = match.groups()
+            if param is not None:
+                # %n parameters (0-9) and %* (all parameters)
+                return self._all_args if param == '*' else self._param(int(param))
+            # Custom variables %VAR%
+            return self._get(var_name, os.environ.get(var_name, ''))
         
-        def replace_var(match):
-            var_name = match.group(1)
-            return self.variables.get(var_name, os.environ.get(var_name, ''))
-        
-        line = re.sub(pattern, replace_var, line)
-        
-        return line
+        return _ALL_RE.sub(replace, line)
     
-    def handle_batch_command(self, line, lines, current_line, filename):
+    def handle_batch_command(self, line, ctx):
         """Handle batch-specific commands"""
-        parts = line.split()
-        if not parts:
+        command, _, operand = line.strip().partition(' ')
+        if not command:
             return None
         
-        command = parts[0].upper()
-        args = parts[1:] if len(parts) > 1 else []
-        
-        # Batch-specific commands
-        if command == 'ECHO':
-            return self.handle_echo(args)
-        elif command == 'SET':
-            return self.handle_set(args)
-        elif command == 'IF':
-            return self.handle_if(args, lines, current_line)
-        elif command == 'FOR':
-            return self.handle_for(args, lines, current_line)
-        elif command == 'GOTO':
-            return self.handle_goto(args)
-        elif command == 'CALL':
-            return self.handle_call(args)
-        elif command == 'SHIFT':
-            return self.handle_shift(args)
-        elif command == 'EXIT':
-            return self.handle_exit(args)
-        elif command == 'PAUSE':
-            return self.handle_pause(args)
-        elif command == 'REM':
-            return None  # Comment - do nothing
-        elif command == 'SETLOCAL':
-            return self.handle_setlocal(args)
-        elif command == 'ENDLOCAL':
-            return self.handle_endlocal(args)
-        else:
-            # Regular command - pass to command processor
-            return self.command_processor.process_command(line)
+        key = self._cmd_intern.get(command)
+        if key is None:
+            key = self._cmd_intern[command] = sys.intern(command.upper())
+        
+        handler = _HANDLERS.get(key)
+        if handler is None:
+            # Regular command - pass to command processor; only EXIT matters
+            if self.command_processor.process_command(line) == 'EXIT':
+                return 'EXIT'
+            return None
+        return handler(self, operand.split(), ctx)
     
-    def handle_echo(self, args):
+    def handle_echo(self, args, ctx):
         """Handle ECHO command in batch context"""
         if not args:
             print(f"ECHO is {'on' if self.echo_on else 'off'}.")
@@ -191,23 +355,23 @@ class BatchProcessor:
         
         return None
     
-    def handle_set(self, args):
+    def handle_set(self, args, ctx):
         """Handle SET command in batch context"""
         if not args:
-            # Display all variables
-            for key, value in sorted(self.variables.items()):
-                print(f"{key}={value}")
-            for key, value in sorted(os.environ.items()):
-                print(f"{key}={value}")
+            # Display all variables in one write
+            out = [f"{key}={value}" for key, value in sorted(self.variables.items())]
+            env = os.environ
+            out.extend(f"{key}={env[key]}" for key in sorted(env))
+            sys.stdout.write('\n'.join(out) + '\n')
         else:
             assignment = ' '.join(args)
             if '=' in assignment:
                 key, value = assignment.split('=', 1)
-                self.variables[key.strip()] = value.strip()
+                self._set(key.strip(), value.strip())
             else:
                 # Display specific variable
                 key = assignment.strip()
-                value = self.variables.get(key, os.environ.get(key, ''))
+                value = self._get(key, os.environ.get(key, ''))
                 if value:
                     print(f"{key}={value}")
                 else:
@@ -215,78 +379,59 @@ class BatchProcessor:
         
         return None
     
-    def handle_if(self, args, lines, current_line):
+    def handle_if(self, args, ctx):
         """Handle IF command (simplified)"""
-        if len(args) < 3:
-            return None
-        
-        # Simple IF implementation
-        # IF condition command
-        condition_met = False
+        negate, mode, operand, command = _parse_if(' '.join(args))
         
         # Handle IF EXIST filename
-        if args[0].upper() == 'EXIST':
-            filename = args[1]
-            condition_met = os.path.exists(filename)
-            command = ' '.join(args[2:])
+        if mode == 'EXIST':
+            condition_met = os.path.exists(operand)
+        
+        # Handle IF DEFINED variable
+        elif mode == 'DEFINED':
+            condition_met = self._get(operand, None) is not None or operand in os.environ
         
         # Handle IF string1==string2
-        elif '==' in ' '.join(args):
-            parts = ' '.join(args).split('==', 1)
-            if len(parts) == 2:
-                left = parts[0].strip().strip('"')
-                right_and_command = parts[1].strip()
-                
-                # Find where the command starts
-                right_parts = right_and_command.split()
-                if right_parts:
-                    right = right_parts[0].strip('"')
-                    command = ' '.join(right_parts[1:])
-                    condition_met = (left == right)
+        elif mode == '==':
+            left, right = operand
+            condition_met = (left == right)
         
         # Handle IF ERRORLEVEL n
-        elif args[0].upper() == 'ERRORLEVEL':
-            try:
-                level = int(args[1])
-                # In a real implementation, this would check last command's error level
-                condition_met = False  # Simplified
-                command = ' '.join(args[2:])
-            except (ValueError, IndexError):
-                return None
-        
-        # Handle IF NOT
-        elif args[0].upper() == 'NOT':
-            # Recursive call with NOT removed
-            result = self.handle_if(args[1:], lines, current_line)
-            # Invert the condition (simplified)
-            return result
-        
-        # Execute command if condition is met
-        if condition_met and 'command' in locals():
-            return self.command_processor.process_command(command)
+        elif mode == 'ERRORLEVEL':
+            # In a real implementation, this would check last command's error level
+            condition_met = False  # Simplified
+        
+        else:
+            return None
+        
+        # Run the command through the batch dispatcher so GOTO/CALL work
+        if condition_met != negate and command:
+            return self.handle_batch_command(command, ctx)
         
         return None
     
-    def handle_for(self, args, lines, current_line):
+    def handle_for(self, args, ctx):
         """Handle FOR command (simplified)"""
         # FOR %variable IN (set) DO command
         # This is a simplified implementation
         print("FOR command in batch files is not fully implemented.")
         return None
     
-    def handle_goto(self, args):
+    def handle_goto(self, args, ctx):
         """Handle GOTO command"""
         if not args:
             return None
         
-        label = args[0].upper()
-        if label in self.goto_labels:
-            return self.goto_labels[label]
+        label = args[0].lstrip(':').upper()
+        if label == 'EOF':
+            return len(ctx.program.instructions)
+        if label in ctx.program.labels:
+            return ctx.program.labels[label]
         else:
             print(f"The system cannot find the batch label specified - {args[0]}")
             return 'EXIT'
     
-    def handle_call(self, args):
+    def handle_call(self, args, ctx):
         """Handle CALL command"""
         if not args:
             return None
@@ -296,44 +441,42 @@ class BatchProcessor:
         call_args = args[1:] if len(args) > 1 else []
         
         if target.startswith(':'):
-            # Call label in current file
+            # Call label in current file as a subroutine
             label = target[1:].upper()
-            if label in self.goto_labels:
-                # Save current state
-                self.call_stack.append({
-                    'variables': self.variables.copy(),
-                    'return_line': current_line + 1
-                })
-                return self.goto_labels[label]
+            if label in ctx.program.labels:
+                return self.call_subroutine(ctx.program, ctx.program.labels[label],
+                                            [target] + call_args)
+            else:
+                print(f"The system cannot find the batch label specified - {label}")
         else:
             # Call external batch file
             if os.path.exists(target):
-                saved_vars = self.variables.copy()
+                depth = len(self._scopes)
+                saved_args = (self._argv, self._arg_base, self._all_args)
+                self._scopes.append({})
                 self.execute_batch_file(target, [target] + call_args)
-                self.variables = saved_vars
+                del self._scopes[depth:]
+                self._argv, self._arg_base, self._all_args = saved_args
         
         return None
     
-    def handle_shift(self, args):
+    def call_subroutine(self, program, index, params):
+        """Run program from instruction index as a CALL :label subroutine"""
+        # Only the parameters are local; SET inside the subroutine is
+        # visible to the caller afterwards
+        saved_args = (self._argv, self._arg_base, self._all_args)
+        self.set_batch_parameters(params)
+        result = self.execute_batch_lines(program, None, index)
+        self._argv, self._arg_base, self._all_args = saved_args
+        return 'EXIT' if result == 'EXIT' else None
+    
+    def handle_shift(self, args, ctx):
         """Handle SHIFT command"""
         # Shift parameters %1->%0, %2->%1, etc.
-        new_vars = {}
-        
-        # Shift numbered parameters
-        for i in range(9):
-            next_param = str(i + 1)
-            if next_param in self.variables:
-                new_vars[str(i)] = self.variables[next_param]
-            else:
-                new_vars[str(i)] = ''
-        
-        # Update variables
-        for i in range(9):
-            self.variables[str(i)] = new_vars[str(i)]
-        
+        self._arg_base += 1
         return None
     
-    def handle_exit(self, args):
+    def handle_exit(self, args, ctx):
         """Handle EXIT command"""
         if args and args[0].upper() == '/B':
             # Exit batch file only
@@ -342,7 +485,7 @@ class BatchProcessor:
             # Exit entire command processor
             return 'EXIT'
     
-    def handle_pause(self, args):
+    def handle_pause(self, args, ctx):
         """Handle PAUSE command"""
         print("Press any key to continue . . . ", end='')
         try:
@@ -351,24 +494,64 @@ class BatchProcessor:
             pass
         return None
     
-    def handle_setlocal(self, args):
+    def handle_setlocal(self, args, ctx):
         """Handle SETLOCAL command"""
-        # Save current environment
-        self.call_stack.append({
-            'variables': self.variables.copy(),
-            'environment': dict(os.environ)
-        })
+        # Start a new variable scope
+        self._scopes.append({})
         return None
     
-    def handle_endlocal(self, args):
+    def handle_endlocal(self, args, ctx):
         """Handle ENDLOCAL command"""
-        # Restore previous environment
-        if self.call_stack:
-            saved_state = self.call_stack.pop()
-            self.variables = saved_state.get('variables', {})
+        # Discard the innermost variable scope
+        if len(self._scopes) > 1:
+            self._scopes.pop()
             # Note: In a real implementation, this would restore os.environ too
         return None
 
+# Opcode dispatch table for compiled batch instructions
+_OPTABLE = {
+    OP_REM: lambda self, args, ctx: None,
+    OP_ECHO: BatchProcessor.handle_echo,
+    OP_SET: BatchProcessor.handle_set,
+    OP_IF: BatchProcessor.handle_if,
+    OP_FOR: BatchProcessor.handle_for,
+    OP_GOTO: BatchProcessor.handle_goto,
+    OP_CALL: BatchProcessor.handle_call,
+    OP_SHIFT: BatchProcessor.handle_shift,
+    OP_EXIT: BatchProcessor.handle_exit,
+    OP_PAUSE: BatchProcessor.handle_pause,
+    OP_SETLOCAL: BatchProcessor.handle_setlocal,
+    OP_ENDLOCAL: BatchProcessor.handle_endlocal,
+}
+
+# Batch keyword dispatch for lines resolved at run time
+_HANDLERS = {name: _OPTABLE[op] for name, op in _KEYWORDS.items()}
+
+# Directory listings keyed by path: (st_mtime_ns, {lowercased name: name})
+_DIR_CACHE = {}
+
+def _list_dir_lower(directory):
+    """Get a directory's entries by lowercased name, cached by mtime"""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return {}
+    
+    # The current directory changes with CD, so key it by absolute path
+    key = os.path.abspath(directory) if directory == '.' else directory
+    cached = _DIR_CACHE.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    try:
+        with os.scandir(directory) as it:
+            names = {entry.name.lower(): entry.name for entry in it}
+    except OSError:
+        names = {}
+    
+    _DIR_CACHE[key] = (mtime, names)
+    return names
+
 class BatchFileDetector:
     """Detects and handles batch file execution"""
     
@@ -381,24 +564,36 @@ class BatchFileDetector:
         _, ext = os.path.splitext(filename.lower())
         return ext in ['.bat', '.cmd']
     
-    @staticmethod
-    def find_batch_file(command):
+    _path_key = None
+    _path_dirs = []
+    
+    @classmethod
+    def find_batch_file(cls, command):
         """Find batch file in current directory or PATH"""
-        # Check current directory first
-        for ext in ['.bat', '.cmd']:
-            filepath = command + ext
-            if os.path.isfile(filepath):
-                return filepath
-        
-        # Check PATH directories
-        path_dirs = os.environ.get('PATH', '').split(os.pathsep)
-        for directory in path_dirs:
-            if not directory:
-                continue
-            
+        directory, name = os.path.split(command)
+        if directory:
+            # Explicit path - no search
             for ext in ['.bat', '.cmd']:
-                filepath = os.path.join(directory, command + ext)
+                filepath = command + ext
                 if os.path.isfile(filepath):
                     return filepath
+            return None
+        
+        path = os.environ.get('PATH', '')
+        if path != cls._path_key:
+            cls._path_key = path
+            cls._path_dirs = [d for d in path.split(os.pathsep) if d]
+        
+        # Check current directory first, then PATH directories
+        name = name.lower()
+        candidates = (name + '.bat', name + '.cmd')
+        for directory in ['.'] + cls._path_dirs:
+            listing = _list_dir_lower(directory)
+            for candidate in candidates:
+                actual = listing.get(candidate)
+                if actual is not None:
+                    filepath = os.path.join(directory, actual)
+                    if os.path.isfile(filepath):
+                        return actual if directory == '.' else filepath
         
         return None
\ No newline at end of file
@@ -3,9 +3,10 @@ Command Processor - Handles command parsing and execution
 """
 
 import os
+import re
 import sys
-import shlex
 import subprocess
+from contextlib import redirect_stdout
 from pathlib import Path
 from commands import *
 from full_commands import *
@@ -13,102 +14,187 @@ from batch_support import BatchProcessor, BatchFileDetector
 from pipe_support import integrate_pipeline_support
 from doskey_support import integrate_doskey_support
 
+# %VAR% reference in a command line
+_PCT_RE = re.compile(r'%([^%\s]+)%')
+
+# Compound command operators, captured so split() keeps them; the & in
+# handle duplications such as 2>&1 is not an operator
+_COMPOUND_RE = re.compile(r'(\|\||&&|(?<![<>])&)')
+
+def _split_quoted(line):
+    """Split a command line on whitespace, keeping quoted sections intact"""
+    parts = []
+    current = []
+    i, n = 0, len(line)
+    
+    while i < n:
+        char = line[i]
+        if char == '"' or char == "'":
+            # Copy the whole quoted section, quotes included
+            end = line.find(char, i + 1)
+            if end < 0:
+                raise ValueError("No closing quotation")
+            current.append(line[i:end + 1])
+            i = end + 1
+        elif char.isspace():
+            if current:
+                parts.append(''.join(current))
+                current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    
+    if current:
+        parts.append(''.join(current))
+    return parts
+
+# Characters that only a shell can interpret
+_SHELL_META_RE = re.compile(r'[<>|&^]')
+
+# Built-in command classes; instances are created on first use. Plain
+# passthrough tools are ready-made instances in PASSTHROUGH_COMMANDS.
+_COMMAND_CLASSES = {
+    # File and Directory Operations
+    'cd': CDCommand, 'chdir': CDCommand,
+    'dir': DirCommand, 'ls': DirCommand,
+    'copy': CopyCommand, 'xcopy': XCopyCommand, 'robocopy': RobocopyCommand,
+    'move': MoveCommand, 'ren': RenameCommand, 'rename': RenameCommand,
+    'del': DelCommand, 'erase': DelCommand, 'rd': RmdirCommand, 'rmdir': RmdirCommand,
+    'md': MkdirCommand, 'mkdir': MkdirCommand,
+    'type': TypeCommand, 'more': MoreCommand, 'edit': EditCommand,
+    'notepad': NotepadCommand, 'wordpad': WordpadCommand,
+    'attrib': AttribCommand, 'comp': CompCommand, 'fc': FcCommand,
+    'replace': ReplaceCommand, 'subst': SubstCommand,
+
+    # Text Processing
+    'find': FindCommand, 'findstr': FindStrCommand, 'sort': SortCommand,
+    'clip': ClipCommand, 'print': PrintCommand,
+
+    # System Information
+    'ver': VerCommand, 'date': DateCommand, 'time': TimeCommand,
+    'systeminfo': SystemInfoCommand, 'hostname': HostnameCommand,
+    'whoami': WhoamiCommand, 'logoff': LogoffCommand,
+
+    # Process Management
+    'tasklist': TaskListCommand, 'taskkill': TaskKillCommand,
+    'start': StartCommand, 'call': CallCommand, 'timeout': TimeoutCommand,
+
+    # Network Commands
+    'ping': PingCommand, 'tracert': TracertCommand, 'pathping': PathpingCommand,
+    'ipconfig': IpConfigCommand, 'nslookup': NslookupCommand, 'telnet': TelnetCommand,
+    'ftp': FtpCommand, 'netsh': NetshCommand,
+
+    # Disk and Volume Management
+    'vol': VolCommand, 'label': LabelCommand, 'chkdsk': ChkDskCommand,
+    'format': FormatCommand, 'diskpart': DiskPartCommand, 'fsutil': FsutilCommand,
+    'defrag': DefragCommand, 'cipher': CipherCommand,
+
+    # Registry Operations
+    'reg': RegCommand, 'regedit': RegeditCommand,
+
+    # Service Management
+    'sc': ScCommand, 'net': NetCommand,
+
+    # System Utilities
+    'sfc': SfcCommand, 'dism': DismCommand,
+    'msconfig': MsconfigCommand, 'msinfo32': Msinfo32Command,
+    'eventvwr': EventvwrCommand, 'perfmon': PerfmonCommand,
+
+    # Environment and Settings
+    'set': SetCommand, 'setx': SetxCommand, 'path': PathCommand,
+    'prompt': PromptCommand, 'title': TitleCommand, 'color': ColorCommand,
+    'mode': ModeCommand, 'chcp': ChcpCommand,
+
+    # Console Operations
+    'echo': EchoCommand, 'cls': ClsCommand, 'clear': ClsCommand,
+    'pause': PauseCommand, 'choice': ChoiceCommand,
+
+    # Batch Operations
+    'if': IfCommand, 'for': ForCommand, 'goto': GotoCommand,
+    'shift': ShiftCommand, 'exit': ExitCommand, 'endlocal': EndlocalCommand,
+    'setlocal': SetlocalCommand, 'rem': RemCommand,
+
+    # Archive and Compression
+    'expand': ExpandCommand, 'makecab': MakecabCommand,
+
+    # Security
+    'cipher': CipherCommand, 'cacls': CaclsCommand, 'runas': RunasCommand,
+
+    # Advanced System Tools
+    'wmic': WmicCommand, 'powershell': PowershellCommand, 'cmd': CmdCommand,
+    'help': HelpCommand, 'where': WhereCommand, 'which': WhereCommand,
+    'tree': TreeCommand, 'doskey': DoskeyCommand,
+
+    # Scheduling
+    'at': AtCommand,
+
+    # Memory and Performance
+    'mem': MemCommand, 'taskmgr': TaskmgrCommand,
+
+    # File Associations
+    'assoc': AssocCommand, 'ftype': FtypeCommand,
+
+    # Miscellaneous
+    'calc': CalcCommand, 'explorer': ExplorerCommand, 'mspaint': MspaintCommand,
+    'control': ControlCommand, 'appwiz.cpl': AppwizCommand,
+}
+
+class _LazyCommandMap:
+    """Built-in command table that instantiates commands on demand"""
+    
+    def __init__(self, classes, instances=None):
+        self._classes = classes
+        self._instances = dict(instances or ())
+        self._shared = {}
+        # Bumped whenever a new name is added, so name indexes can rebuild
+        self.version = 0
+    
+    def __contains__(self, name):
+        return name in self._instances or name in self._classes
+    
+    def __getitem__(self, name):
+        instance = self._instances.get(name)
+        if instance is None:
+            # Aliases such as cd/chdir share one instance
+            cls = self._classes[name]
+            instance = self._shared.get(cls)
+            if instance is None:
+                instance = self._shared[cls] = cls()
+            self._instances[name] = instance
+        return instance
+    
+    def __setitem__(self, name, command):
+        if name not in self:
+            self.version += 1
+        self._instances[name] = command
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def keys(self):
+        return self._classes.keys() | self._instances.keys()
+
 class CommandProcessor:
     def __init__(self):
         # Initialize built-in commands
-        self.builtin_commands = {
-            # File and Directory Operations
-            'cd': CDCommand(), 'chdir': CDCommand(),
-            'dir': DirCommand(), 'ls': DirCommand(),
-            'copy': CopyCommand(), 'xcopy': XCopyCommand(), 'robocopy': RobocopyCommand(),
-            'move': MoveCommand(), 'ren': RenameCommand(), 'rename': RenameCommand(),
-            'del': DelCommand(), 'erase': DelCommand(), 'rd': RmdirCommand(), 'rmdir': RmdirCommand(),
-            'md': MkdirCommand(), 'mkdir': MkdirCommand(),
-            'type': TypeCommand(), 'more': MoreCommand(), 'edit': EditCommand(),
-            'notepad': NotepadCommand(), 'wordpad': WordpadCommand(),
-            'attrib': AttribCommand(), 'comp': CompCommand(), 'fc': FcCommand(),
-            'replace': ReplaceCommand(), 'subst': SubstCommand(),
-            
-            # Text Processing
-            'find': FindCommand(), 'findstr': FindStrCommand(), 'sort': SortCommand(),
-            'clip': ClipCommand(), 'print': PrintCommand(),
-            
-            # System Information
-            'ver': VerCommand(), 'date': DateCommand(), 'time': TimeCommand(),
-            'systeminfo': SystemInfoCommand(), 'hostname': HostnameCommand(),
-            'whoami': WhoamiCommand(), 'logoff': LogoffCommand(),
-            
-            # Process Management
-            'tasklist': TaskListCommand(), 'taskkill': TaskKillCommand(),
-            'start': StartCommand(), 'call': CallCommand(), 'timeout': TimeoutCommand(),
-            
-            # Network Commands
-            'ping': PingCommand(), 'tracert': TracertCommand(), 'pathping': PathpingCommand(),
-            'ipconfig': IpConfigCommand(), 'nslookup': NslookupCommand(), 'arp': ArpCommand(),
-            'netstat': NetstatCommand(), 'route': RouteCommand(), 'telnet': TelnetCommand(),
-            'ftp': FtpCommand(), 'netsh': NetshCommand(),
-            
-            # Disk and Volume Management
-            'vol': VolCommand(), 'label': LabelCommand(), 'chkdsk': ChkDskCommand(),
-            'format': FormatCommand(), 'diskpart': DiskPartCommand(), 'fsutil': FsutilCommand(),
-            'defrag': DefragCommand(), 'cipher': CipherCommand(),
-            
-            # Registry Operations
-            'reg': RegCommand(), 'regedit': RegeditCommand(),
-            
-            # Service Management
-            'sc': ScCommand(), 'net': NetCommand(),
-            
-            # System Utilities
-            'sfc': SfcCommand(), 'dism': DismCommand(), 'powercfg': PowercfgCommand(),
-            'msconfig': MsconfigCommand(), 'msinfo32': Msinfo32Command(),
-            'eventvwr': EventvwrCommand(), 'perfmon': PerfmonCommand(),
-            
-            # Environment and Settings
-            'set': SetCommand(), 'setx': SetxCommand(), 'path': PathCommand(),
-            'prompt': PromptCommand(), 'title': TitleCommand(), 'color': ColorCommand(),
-            'mode': ModeCommand(), 'chcp': ChcpCommand(),
-            
-            # Console Operations
-            'echo': EchoCommand(), 'cls': ClsCommand(), 'clear': ClsCommand(),
-            'pause': PauseCommand(), 'choice': ChoiceCommand(),
-            
-            # Batch Operations
-            'if': IfCommand(), 'for': ForCommand(), 'goto': GotoCommand(),
-            'shift': ShiftCommand(), 'exit': ExitCommand(), 'endlocal': EndlocalCommand(),
-            'setlocal': SetlocalCommand(), 'rem': RemCommand(),
-            
-            # Archive and Compression
-            'expand': ExpandCommand(), 'makecab': MakecabCommand(), 'compact': CompactCommand(),
-            
-            # Security
-            'cipher': CipherCommand(), 'cacls': CaclsCommand(), 'icacls': IcaclsCommand(),
-            'takeown': TakeownCommand(), 'runas': RunasCommand(),
-            
-            # Advanced System Tools
-            'wmic': WmicCommand(), 'powershell': PowershellCommand(), 'cmd': CmdCommand(),
-            'help': HelpCommand(), 'where': WhereCommand(), 'which': WhereCommand(),
-            'tree': TreeCommand(), 'doskey': DoskeyCommand(),
-            
-            # Scheduling
-            'at': AtCommand(), 'schtasks': SchtasksCommand(),
-            
-            # Hardware and Drivers
-            'driverquery': DriverqueryCommand(), 'pnputil': PnputilCommand(),
-            
-            # Memory and Performance
-            'mem': MemCommand(), 'taskmgr': TaskmgrCommand(),
-            
-            # File Associations
-            'assoc': AssocCommand(), 'ftype': FtypeCommand(),
-            
-            # Miscellaneous
-            'calc': CalcCommand(), 'explorer': ExplorerCommand(), 'mspaint': MspaintCommand(),
-            'control': ControlCommand(), 'appwiz.cpl': AppwizCommand(),
-        }
+        self.builtin_commands = _LazyCommandMap(_COMMAND_CLASSES, PASSTHROUGH_COMMANDS)
+        
+        # Lowercased command names, normalized once per distinct spelling
+        self._cmd_intern = {}
         
-        # Environment variables
-        self.env_vars = dict(os.environ)
+        # Exit status of the last command, like %ERRORLEVEL%; && and || test it
+        self.errorlevel = 0
+        
+        # Environment variables - the live environment, so SET is seen at once
+        self.env_vars = os.environ
+        self.refresh_environment()
+        
+        # PATH lookup caches, rebuilt whenever PATH changes
+        self._path_key = None
+        self._path_dirs = []
+        self._exec_cache = {}
+        self._dir_listings = {}
         
         # Batch processor
         self.batch_processor = BatchProcessor(self)
@@ -134,12 +220,17 @@ class CommandProcessor:
     def parse_command(self, command_line):
         """Parse command line into command and arguments"""
         try:
-            # Handle special characters and quotes properly
-            parts = shlex.split(command_line, posix=False)
+            # Plain whitespace split unless quotes need handling
+            if '"' in command_line or "'" in command_line:
+                parts = _split_quoted(command_line)
+            else:
+                parts = command_line.split()
             if not parts:
                 return None, []
             
-            command = parts[0].lower()
+            command = self._cmd_intern.get(parts[0])
+            if command is None:
+                command = self._cmd_intern[parts[0]] = sys.intern(parts[0].lower())
             args = parts[1:] if len(parts) > 1 else []
             
             return command, args
@@ -150,17 +241,34 @@ class CommandProcessor:
             args = parts[1:] if len(parts) > 1 else []
             return command, args
             
+    def refresh_environment(self):
+        """Rebuild the case-insensitive variable name table"""
+        self._env_names = {k.upper(): k for k in self.env_vars}
+        
+    def lookup_variable(self, name):
+        """Get an environment variable, matching the name case-insensitively"""
+        value = self.env_vars.get(name)
+        if value is None:
+            key = self._env_names.get(name.upper())
+            if key is None or key not in self.env_vars:
+                # Variables were added or removed since the table was built
+                self.refresh_environment()
+                key = self._env_names.get(name.upper())
+            if key is not None:
+                value = self.env_vars.get(key)
+        return value
+        
     def expand_variables(self, text):
         """Expand environment variables in text"""
         if '%' not in text:
             return text
             
-        # Simple variable expansion
-        for var, value in self.env_vars.items():
-            text = text.replace(f'%{var}%', value)
-            text = text.replace(f'%{var.lower()}%', value)
-            
-        return text
+        # Single pass; unknown variables are left as-is
+        def replace(match):
+            value = self.lookup_variable(match.group(1))
+            return match.group(0) if value is None else value
+        
+        return _PCT_RE.sub(replace, text)
         
     def process_command(self, command_line):
         """Process a single command line"""
@@ -168,7 +276,7 @@ class CommandProcessor:
         command_line = self.expand_variables(command_line)
         
         # Handle multiple commands separated by &, &&, ||
-        if '&' in command_line or '||' in command_line:
+        if self.is_compound_command(command_line):
             return self.process_compound_command(command_line)
             
         # Handle redirection
@@ -185,9 +293,12 @@ class CommandProcessor:
         if command in self.builtin_commands:
             try:
                 result = self.builtin_commands[command].execute(args)
+                # Passthrough tools return their exit code; anything else is success
+                self.errorlevel = result if type(result) is int else 0
                 return result
             except Exception as e:
                 print(f"'{command}' command failed: {e}")
+                self.errorlevel = 1
                 return
         
         # Check for batch files
@@ -195,121 +306,146 @@ class CommandProcessor:
         if batch_file:
             try:
                 self.batch_processor.execute_batch_file(batch_file, [command] + args)
+                self.errorlevel = 0
                 return
             except Exception as e:
                 print(f"Error executing batch file: {e}")
+                self.errorlevel = 1
                 return
                 
         # Try to execute as external command
         return self.execute_external_command(command, args)
         
+    def is_compound_command(self, command_line):
+        """Check whether a line chains commands with &, && or ||"""
+        return _COMPOUND_RE.search(command_line) is not None
+        
     def process_compound_command(self, command_line):
         """Handle compound commands with &, &&, ||"""
-        # This is a simplified implementation
-        # Real CMD has more complex parsing rules
+        # Tokens alternate command, operator, command, ...
+        tokens = _COMPOUND_RE.split(command_line)
+        result = self.process_command(tokens[0].strip())
+        
+        for i in range(1, len(tokens), 2):
+            if result == "EXIT":
+                return result
+            
+            # && runs only after success, || only after failure
+            succeeded = self.errorlevel == 0
+            operator = tokens[i]
+            if (operator == '&&' and not succeeded) or (operator == '||' and succeeded):
+                continue
+            
+            result = self.process_command(tokens[i + 1].strip())
         
-        if '&&' in command_line:
-            commands = command_line.split('&&')
-            for cmd in commands:
-                result = self.process_command(cmd.strip())
-                if result == "EXIT":
-                    return result
-        elif '||' in command_line:
-            commands = command_line.split('||')
-            for cmd in commands:
-                result = self.process_command(cmd.strip())
-                if result == "EXIT":
-                    return result
-        elif '&' in command_line:
-            commands = command_line.split('&')
-            for cmd in commands:
-                result = self.process_command(cmd.strip())
-                if result == "EXIT":
-                    return result
+        return result
                     
     def process_redirected_command(self, command_line):
         """Handle command redirection"""
         # Simplified redirection handling
         if '>>' in command_line:
-            parts = command_line.split('>>', 1)
-            cmd_part = parts[0].strip()
-            file_part = parts[1].strip()
-            
-            # Capture output and append to file
-            import io
-            from contextlib import redirect_stdout
-            
-            f = io.StringIO()
-            try:
-                with redirect_stdout(f):
-                    self.process_command(cmd_part)
-                output = f.getvalue()
-                
-                with open(file_part, 'a', encoding='utf-8') as outfile:
-                    outfile.write(output)
-            except Exception as e:
-                print(f"Redirection failed: {e}")
-                
+            operator, mode = '>>', 'a'
         elif '>' in command_line:
-            parts = command_line.split('>', 1)
-            cmd_part = parts[0].strip()
-            file_part = parts[1].strip()
-            
-            # Capture output and write to file
-            import io
-            from contextlib import redirect_stdout
-            
-            f = io.StringIO()
-            try:
-                with redirect_stdout(f):
+            operator, mode = '>', 'w'
+        else:
+            return
+        
+        parts = command_line.split(operator, 1)
+        cmd_part = parts[0].strip()
+        file_part = parts[1].strip()
+        
+        # Stream output straight into the file rather than buffering it
+        try:
+            with open(file_part, mode, encoding='utf-8', buffering=64 * 1024) as outfile:
+                with redirect_stdout(outfile):
                     self.process_command(cmd_part)
-                output = f.getvalue()
-                
-                with open(file_part, 'w', encoding='utf-8') as outfile:
-                    outfile.write(output)
-            except Exception as e:
-                print(f"Redirection failed: {e}")
+        except Exception as e:
+            print(f"Redirection failed: {e}")
+            self.errorlevel = 1
                 
     def execute_external_command(self, command, args):
         """Execute external programs"""
         try:
-            # Try to find the executable
-            full_command = [command] + args
-            
-            # Check if it's a batch file or executable
-            if not command.endswith(('.exe', '.com', '.bat', '.cmd')):
+            # Anything the shell still has to parse goes through the shell
+            command_line = ' '.join([command] + args)
+            if _SHELL_META_RE.search(command_line):
+                result = subprocess.run(command_line, shell=True)
+                self.errorlevel = result.returncode
+                return result.returncode
+            
+            # Resolve the executable once and run it directly
+            executable = self.find_executable(command)
+            if executable is None and not command.endswith(('.exe', '.com', '.bat', '.cmd')):
                 # Try adding common extensions
                 for ext in ['.exe', '.com', '.bat', '.cmd']:
-                    if self.find_executable(command + ext):
-                        command = command + ext
+                    executable = self.find_executable(command + ext)
+                    if executable:
                         break
-                        
-            # Execute the command
-            result = subprocess.run(
-                [command] + args,
-                capture_output=False,
-                text=True,
-                shell=True
-            )
             
+            # Not on PATH: may be a cmd.exe internal such as MKLINK or ASSOC,
+            # which only the shell can run
+            if executable is None and os.name == 'nt':
+                result = subprocess.run(command_line, shell=True)
+                self.errorlevel = result.returncode
+                return result.returncode
+            
+            # Quotes were only there to group words into one argument
+            args = [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg
+                    for arg in args]
+            
+            result = subprocess.run([executable or command] + args, shell=False, check=False)
+            self.errorlevel = result.returncode
             return result.returncode
             
         except FileNotFoundError:
             print(f"'{command}' is not recognized as an internal or external command,")
             print("operable program or batch file.")
+            # The code cmd.exe sets for an unknown command
+            self.errorlevel = 9009
         except Exception as e:
             print(f"Error executing '{command}': {e}")
+            self.errorlevel = 1
             
     def find_executable(self, name):
         """Find executable in PATH"""
-        path_dirs = self.env_vars.get('PATH', '').split(os.pathsep)
+        path = self.env_vars.get('PATH', '')
+        if path != self._path_key:
+            self._path_key = path
+            self._path_dirs = [d for d in path.split(os.pathsep) if d]
+            self._exec_cache.clear()
         
-        for directory in path_dirs:
-            if not directory:
-                continue
-                
-            full_path = os.path.join(directory, name)
-            if os.path.isfile(full_path) and os.access(full_path, os.X_OK):
-                return full_path
-                
-        return None
\ No newline at end of file
+        # Names are compared lowercased on Windows, where case is ignored
+        key = os.path.normcase(name)
+        found = self._exec_cache.get(key)
+        if found is not None:
+            return found
+        
+        for directory in self._path_dirs:
+            if key in self._list_directory(directory):
+                full_path = os.path.join(directory, name)
+                if os.path.isfile(full_path) and os.access(full_path, os.X_OK):
+                    # Only hits are cached, so a tool installed later is found
+                    self._exec_cache[key] = full_path
+                    return full_path
+        
+        return None
+        
+    def _list_directory(self, directory):
+        """Get the set of names in a directory, cached by its mtime"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return ()
+        
+        cached = self._dir_listings.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        try:
+            with os.scandir(directory) as it:
+                names = {os.path.normcase(entry.name) for entry in it}
+        except OSError:
+            names = set()
+        
+        self._dir_listings[directory] = (mtime, names)
+        return names
\ No newline at end of file
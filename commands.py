@@ -4,22 +4,152 @@ Contains all the built-in CMD commands
 """
 
 import os
+import io
 import sys
 import shutil
-import datetime
-import platform
+import time
 import subprocess
 import glob
+import fnmatch
 import stat
-from pathlib import Path
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import Config
+
+# Use a larger buffer when shutil falls back to read/write copies
+if hasattr(shutil, 'COPY_BUFSIZE'):
+    shutil.COPY_BUFSIZE = max(shutil.COPY_BUFSIZE, Config.DEFAULT_COPY_BUFFER_SIZE)
+
+# On Windows, CopyFileW copies data and metadata inside the kernel
+if os.name == 'nt':
+    import ctypes
+    _CopyFileW = ctypes.windll.kernel32.CopyFileW
+else:
+    _CopyFileW = None
+
+@functools.lru_cache(maxsize=None)
+def _enable_vt_mode():
+    """Enable VT escape sequences on the console; False if unsupported"""
+    if os.name != 'nt':
+        return True
+    
+    # Windows 10+ consoles understand VT sequences once the mode bit is set
+    try:
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+def _copy_file(source, dest):
+    """Copy a file with its metadata using the fastest copy the OS offers"""
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(source))
+    
+    if _CopyFileW is not None and _CopyFileW(str(source), str(dest), False):
+        return dest
+    
+    # shutil.copy2 already uses sendfile (Linux) and fcopyfile (macOS)
+    return shutil.copy2(source, dest)
+
+def _remove_file(path):
+    """Delete a file; directories matched by a wildcard are skipped"""
+    try:
+        os.remove(path)
+    except (IsADirectoryError, PermissionError):
+        # Windows reports directories as PermissionError
+        if not os.path.isdir(path):
+            raise
+
+def _has_wildcard(text):
+    """Check whether a path component contains glob wildcards"""
+    return '*' in text or '?' in text or '[' in text
+
+def _iter_matches(pattern):
+    """Yield files matching a wildcard pattern"""
+    directory, name = os.path.split(pattern)
+    if not _has_wildcard(name) or _has_wildcard(directory):
+        return glob.iglob(pattern)
+    
+    # Single-directory pattern such as *.log: one scandir plus fnmatch
+    try:
+        with os.scandir(directory or '.') as it:
+            names = [e.name for e in it if not e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return iter(())
+    
+    # Like glob, wildcards do not match names starting with a dot
+    if not name.startswith('.'):
+        names = [n for n in names if not n.startswith('.')]
+    return (os.path.join(directory, n) for n in fnmatch.filter(names, name))
+
+def _copy_tree(source, dest):
+    """Copy a directory tree, copying files on a thread pool"""
+    # Create the directory structure first so workers never race on it
+    dirs = []
+    jobs = []
+    pending = [(source, dest)]
+    dest_real = os.path.realpath(dest)
+    while pending:
+        src_dir, dst_dir = pending.pop()
+        # List before creating, so a destination inside the source is
+        # never picked up as part of it
+        with os.scandir(src_dir) as it:
+            entries = list(it)
+        os.makedirs(dst_dir, exist_ok=True)
+        dirs.append((src_dir, dst_dir))
+        for entry in entries:
+            target = os.path.join(dst_dir, entry.name)
+            if entry.is_dir():
+                # Left over from an earlier copy into the source itself
+                if os.path.realpath(entry.path) != dest_real:
+                    pending.append((entry.path, target))
+            else:
+                jobs.append((entry.path, target))
+    
+    # Copying is I/O bound, so threads overlap the waits despite the GIL
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_copy_file, src, dst) for src, dst in jobs]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    
+    # Directory times last, once their contents have stopped changing
+    for src_dir, dst_dir in dirs:
+        shutil.copystat(src_dir, dst_dir)
+    
+    return len(jobs)
 
 class BaseCommand:
     """Base class for all commands"""
+    # Commands are stateless; one shared instance serves every call
+    __slots__ = ()
+    
     def execute(self, args):
         raise NotImplementedError
         
+# Bumped each time CD changes directory, so text derived from the current
+# directory (such as the prompt) only needs rebuilding when it moves
+_cwd_version = 0
+
+# CD targets resolved against the current directory; None means stay put
+_CD_SPECIAL = {
+    '..': lambda: os.path.dirname(os.getcwd()),
+    '.': lambda: None,
+    '\\': lambda: os.path.splitdrive(os.getcwd())[0] + '\\',
+}
+
 class CDCommand(BaseCommand):
     """Change Directory command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             # No arguments - display current directory
@@ -31,61 +161,94 @@ class CDCommand(BaseCommand):
         # Handle special cases
         if target == '/d' and len(args) > 1:
             target = args[1]
-        elif target == '..':
-            target = os.path.dirname(os.getcwd())
-        elif target == '.':
-            return
-        elif target == '\\':
-            target = os.path.splitdrive(os.getcwd())[0] + '\\'
+        else:
+            special = _CD_SPECIAL.get(target)
+            if special is not None:
+                target = special()
+                if target is None:
+                    return
             
+        global _cwd_version
         try:
             os.chdir(target)
+            _cwd_version += 1
         except FileNotFoundError:
             print(f"The system cannot find the path specified.")
         except Exception as e:
             print(f"Error: {e}")
 
+# Free space by drive (or path where there are no drives): (time, free bytes)
+_DISK_FREE_CACHE = {}
+
+def _cached_disk_free(path, ttl=1.0):
+    """Free bytes on the volume holding path, cached for ttl seconds"""
+    key = os.path.splitdrive(path)[0] or path
+    now = time.monotonic()
+    cached = _DISK_FREE_CACHE.get(key)
+    if cached and now - cached[0] < ttl:
+        return cached[1]
+    
+    free = shutil.disk_usage(path).free
+    _DISK_FREE_CACHE[key] = (now, free)
+    return free
+
 class DirCommand(BaseCommand):
     """Directory listing command"""
+    __slots__ = ()
     def execute(self, args):
         path = args[0] if args else '.'
         
         try:
-            entries = list(Path(path).iterdir())
-            
-            # Print header
-            print(f" Volume in drive {os.path.splitdrive(os.getcwd())[0]} has no label.")
-            print(f" Volume Serial Number is 0000-0000")
-            print()
-            print(f" Directory of {os.path.abspath(path)}")
-            print()
+            # One pass: stat each entry once and file it by type
+            dirs, files = [], []
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        # Broken link or vanished entry
+                        continue
+                    (dirs if stat.S_ISDIR(st.st_mode) else files).append((entry.name, st))
+            dirs.sort()
+            files.sort()
             
-            # Sort entries
-            dirs = sorted([e for e in entries if e.is_dir()])
-            files = sorted([e for e in entries if e.is_file()])
+            # Header
+            abs_path = os.path.abspath(path)
+            out = [
+                f" Volume in drive {os.path.splitdrive(os.getcwd())[0]} has no label.",
+                f" Volume Serial Number is 0000-0000",
+                "",
+                f" Directory of {abs_path}",
+                "",
+            ]
             
             file_count = 0
             dir_count = 0
             total_size = 0
             
+            # Hot loop locals
+            fmt = Config.DIR_DATE_FORMAT
+            localtime = time.localtime
+            strftime = time.strftime
+            append = out.append
+            
             # Display directories first
-            for d in dirs:
-                stat_info = d.stat()
-                mod_time = datetime.datetime.fromtimestamp(stat_info.st_mtime)
-                print(f"{mod_time.strftime('%m/%d/%Y  %I:%M %p')}    <DIR>          {d.name}")
+            for name, st in dirs:
+                append(f"{strftime(fmt, localtime(st.st_mtime))}    <DIR>          {name}")
                 dir_count += 1
                 
             # Display files
-            for f in files:
-                stat_info = f.stat()
-                mod_time = datetime.datetime.fromtimestamp(stat_info.st_mtime)
-                size = stat_info.st_size
-                print(f"{mod_time.strftime('%m/%d/%Y  %I:%M %p')} {size:>14,} {f.name}")
+            for name, st in files:
+                size = st.st_size
+                append(f"{strftime(fmt, localtime(st.st_mtime))} {size:>14,} {name}")
                 file_count += 1
                 total_size += size
                 
-            print(f"               {file_count} File(s) {total_size:>14,} bytes")
-            print(f"               {dir_count} Dir(s)  {shutil.disk_usage('.').free:>14,} bytes free")
+            append(f"               {file_count} File(s) {total_size:>14,} bytes")
+            append(f"               {dir_count} Dir(s)  {_cached_disk_free(abs_path):>14,} bytes free")
+            
+            # One write for the whole listing
+            sys.stdout.write('\n'.join(out) + '\n')
             
         except FileNotFoundError:
             print("File Not Found")
@@ -94,6 +257,7 @@ class DirCommand(BaseCommand):
 
 class CopyCommand(BaseCommand):
     """Copy files command"""
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("The syntax of the command is incorrect.")
@@ -103,7 +267,7 @@ class CopyCommand(BaseCommand):
         dest = args[1]
         
         try:
-            shutil.copy2(source, dest)
+            _copy_file(source, dest)
             print("        1 file(s) copied.")
         except FileNotFoundError:
             print("The system cannot find the file specified.")
@@ -112,6 +276,7 @@ class CopyCommand(BaseCommand):
 
 class XCopyCommand(BaseCommand):
     """Extended copy command"""
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("Invalid number of parameters")
@@ -122,15 +287,16 @@ class XCopyCommand(BaseCommand):
         
         try:
             if os.path.isdir(source):
-                shutil.copytree(source, dest, dirs_exist_ok=True)
+                _copy_tree(source, dest)
             else:
-                shutil.copy2(source, dest)
+                _copy_file(source, dest)
             print("Files copied successfully.")
         except Exception as e:
             print(f"Error: {e}")
 
 class MoveCommand(BaseCommand):
     """Move files/directories command"""
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("The syntax of the command is incorrect.")
@@ -147,6 +313,7 @@ class MoveCommand(BaseCommand):
 
 class RenameCommand(BaseCommand):
     """Rename files command"""
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("The syntax of the command is incorrect.")
@@ -162,27 +329,40 @@ class RenameCommand(BaseCommand):
 
 class DelCommand(BaseCommand):
     """Delete files command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("The syntax of the command is incorrect.")
             return
-            
-        for pattern in args:
-            try:
-                files = glob.glob(pattern)
-                if not files:
-                    print("Could Not Find " + pattern)
-                    continue
+        
+        # Deletes are syscall bound and independent, so run them on threads.
+        # Matches are submitted as the glob yields them, overlapping the
+        # directory walk with the deletes.
+        futures = []
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            for pattern in args:
+                try:
+                    matches = _iter_matches(pattern)
+                    first = next(matches, None)
+                    if first is None:
+                        print("Could Not Find " + pattern)
+                        continue
                     
-                for file in files:
-                    if os.path.isfile(file):
-                        os.remove(file)
-                        
-            except Exception as e:
-                print(f"Error: {e}")
+                    futures.append(pool.submit(_remove_file, first))
+                    for file in matches:
+                        futures.append(pool.submit(_remove_file, file))
+                except Exception as e:
+                    print(f"Error: {e}")
+            
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error: {e}")
 
 class MkdirCommand(BaseCommand):
     """Make directory command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("The syntax of the command is incorrect.")
@@ -196,6 +376,7 @@ class MkdirCommand(BaseCommand):
 
 class RmdirCommand(BaseCommand):
     """Remove directory command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("The syntax of the command is incorrect.")
@@ -214,6 +395,7 @@ class RmdirCommand(BaseCommand):
 
 class TypeCommand(BaseCommand):
     """Display file contents command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("The syntax of the command is incorrect.")
@@ -221,15 +403,47 @@ class TypeCommand(BaseCommand):
             
         for filename in args:
             try:
-                with open(filename, 'r', encoding='utf-8', errors='replace') as f:
-                    print(f.read(), end='')
+                with open(filename, 'rb') as f:
+                    self._stream(f)
             except FileNotFoundError:
                 print("The system cannot find the file specified.")
             except Exception as e:
                 print(f"Error: {e}")
 
+    def _stream(self, f):
+        """Copy an open binary file to stdout in 1MB chunks"""
+        out = sys.stdout
+        chunk = 1 << 20
+        
+        # Real stdout redirected to a file or pipe: let the kernel copy
+        if out is sys.__stdout__ and hasattr(os, 'sendfile') and not out.isatty():
+            out.flush()
+            try:
+                while os.sendfile(out.fileno(), f.fileno(), None, chunk):
+                    pass
+                return
+            except OSError:
+                pass
+        
+        # Console or other binary stream: raw bytes, no decode/encode
+        buffer = getattr(out, 'buffer', None)
+        if buffer is not None:
+            out.flush()
+            shutil.copyfileobj(f, buffer, chunk)
+            buffer.flush()
+            return
+        
+        # In-memory capture from redirection or pipes needs text
+        text = io.TextIOWrapper(f, encoding='utf-8', errors='replace')
+        try:
+            for data in iter(lambda: text.read(chunk), ''):
+                out.write(data)
+        finally:
+            text.detach()
+
 class EchoCommand(BaseCommand):
     """Echo command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("ECHO is on.")
@@ -244,71 +458,85 @@ class EchoCommand(BaseCommand):
 
 class ClsCommand(BaseCommand):
     """Clear screen command"""
+    __slots__ = ()
     def execute(self, args):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Only a terminal understands the escape; console mode is set on first use
+        if sys.stdout.isatty() and _enable_vt_mode():
+            # Clear screen and home the cursor with one write
+            sys.stdout.write('\x1b[2J\x1b[H')
+            sys.stdout.flush()
+        else:
+            os.system('cls' if os.name == 'nt' else 'clear')
 
 class ExitCommand(BaseCommand):
     """Exit command"""
+    __slots__ = ()
     def execute(self, args):
         return "EXIT"
 
+# HELP command listing and per-command descriptions
+_HELP_COMMANDS = (
+    "CD", "COPY", "DEL", "DIR", "ECHO", "EXIT", "HELP", "MD", "MOVE",
+    "RD", "REN", "TYPE", "VER", "VOL", "DATE", "TIME", "CLS", "FIND",
+    "TREE", "ATTRIB", "WHERE", "TASKLIST", "PING"
+)
+
+_HELP_TEXT = {
+    "CD": "Displays the name of or changes the current directory.",
+    "COPY": "Copies one or more files to another location.",
+    "DEL": "Deletes one or more files.",
+    "DIR": "Displays a list of files and subdirectories in a directory.",
+    "ECHO": "Displays messages, or turns command echoing on or off.",
+    "EXIT": "Quits the CMD.EXE program (command interpreter).",
+    "HELP": "Provides Help information for Windows commands.",
+    "MD": "Creates a directory.",
+    "MOVE": "Moves one or more files from one directory to another directory.",
+    "RD": "Removes a directory.",
+    "REN": "Renames a file or files.",
+    "TYPE": "Displays the contents of a text file.",
+    "VER": "Displays the Windows version.",
+    "CLS": "Clears the screen."
+}
+
 class HelpCommand(BaseCommand):
     """Help command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("For more information on a specific command, type HELP command-name")
-            commands = [
-                "CD", "COPY", "DEL", "DIR", "ECHO", "EXIT", "HELP", "MD", "MOVE", 
-                "RD", "REN", "TYPE", "VER", "VOL", "DATE", "TIME", "CLS", "FIND",
-                "TREE", "ATTRIB", "WHERE", "TASKLIST", "PING"
-            ]
-            
-            for i in range(0, len(commands), 3):
-                row = commands[i:i+3]
-                print("".join(f"{cmd:<15}" for cmd in row))
+            rows = ["".join(f"{cmd:<15}" for cmd in _HELP_COMMANDS[i:i+3])
+                    for i in range(0, len(_HELP_COMMANDS), 3)]
+            sys.stdout.write('\n'.join(rows) + '\n')
         else:
             command = args[0].upper()
-            help_text = {
-                "CD": "Displays the name of or changes the current directory.",
-                "COPY": "Copies one or more files to another location.",
-                "DEL": "Deletes one or more files.",
-                "DIR": "Displays a list of files and subdirectories in a directory.",
-                "ECHO": "Displays messages, or turns command echoing on or off.",
-                "EXIT": "Quits the CMD.EXE program (command interpreter).",
-                "HELP": "Provides Help information for Windows commands.",
-                "MD": "Creates a directory.",
-                "MOVE": "Moves one or more files from one directory to another directory.",
-                "RD": "Removes a directory.",
-                "REN": "Renames a file or files.",
-                "TYPE": "Displays the contents of a text file.",
-                "VER": "Displays the Windows version.",
-                "CLS": "Clears the screen."
-            }
-            
-            if command in help_text:
-                print(help_text[command])
+            if command in _HELP_TEXT:
+                print(_HELP_TEXT[command])
             else:
                 print(f"This command is not supported by the help utility.")
 
 class VerCommand(BaseCommand):
     """Version command"""
+    __slots__ = ()
     def execute(self, args):
         print("Microsoft Windows [Version 10.0.19041.1706]")
 
 class DateCommand(BaseCommand):
     """Date command"""
+    __slots__ = ()
     def execute(self, args):
-        current_date = datetime.datetime.now()
-        print(f"The current date is: {current_date.strftime('%a %m/%d/%Y')}")
+        print(f"The current date is: {time.strftime('%a %m/%d/%Y')}")
         
 class TimeCommand(BaseCommand):
     """Time command"""
+    __slots__ = ()
     def execute(self, args):
-        current_time = datetime.datetime.now()
-        print(f"The current time is: {current_time.strftime('%H:%M:%S.%f')[:-4]}")
+        # cmd shows hundredths of a second
+        t = time.time()
+        print(f"The current time is: {time.strftime('%H:%M:%S', time.localtime(t))}.{int(t % 1 * 100):02d}")
 
 class PathCommand(BaseCommand):
     """Path command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print(f"PATH={os.environ.get('PATH', '')}")
@@ -317,11 +545,13 @@ class PathCommand(BaseCommand):
 
 class SetCommand(BaseCommand):
     """Set environment variables command"""
+    __slots__ = ()
     def execute(self, args):
         if not args:
-            # Display all environment variables
-            for key, value in sorted(os.environ.items()):
-                print(f"{key}={value}")
+            # Display all environment variables in one write
+            env = os.environ
+            out = [f"{key}={env[key]}" for key in sorted(env)]
+            sys.stdout.write('\n'.join(out) + '\n')
         else:
             var_assignment = ' '.join(args)
             if '=' in var_assignment:
@@ -338,6 +568,7 @@ class SetCommand(BaseCommand):
 
 class PromptCommand(BaseCommand):
     """Prompt command"""
+    __slots__ = ()
     def execute(self, args):
         if args:
             print("PROMPT command is not fully implemented in this clone.")
@@ -346,6 +577,7 @@ class PromptCommand(BaseCommand):
 
 class TitleCommand(BaseCommand):
     """Title command"""
+    __slots__ = ()
     def execute(self, args):
         if args:
             title = ' '.join(args)
@@ -354,6 +586,7 @@ class TitleCommand(BaseCommand):
 
 class ColorCommand(BaseCommand):
     """Color command"""
+    __slots__ = ()
     def execute(self, args):
         if args:
             print("COLOR command is not fully implemented in this clone.")
@@ -363,55 +596,111 @@ class ColorCommand(BaseCommand):
 # Additional commands for completeness
 class FindCommand(BaseCommand):
     """Find command"""
+    __slots__ = ()
     def execute(self, args):
         print("FIND command is not fully implemented in this clone.")
 
 class FindStrCommand(BaseCommand):
     """Find string command"""
+    __slots__ = ()
     def execute(self, args):
         print("FINDSTR command is not fully implemented in this clone.")
 
 class SortCommand(BaseCommand):
     """Sort command"""
+    __slots__ = ()
     def execute(self, args):
         print("SORT command is not fully implemented in this clone.")
 
 class MoreCommand(BaseCommand):
     """More command"""
+    __slots__ = ()
     def execute(self, args):
         print("MORE command is not fully implemented in this clone.")
 
+# TREE branch glyphs: (branch, last branch, continuation)
+_TREE_GLYPHS = ('\u251c\u2500\u2500\u2500', '\u2514\u2500\u2500\u2500', '\u2502   ')
+_TREE_GLYPHS_ASCII = ('+---', '\\---', '|   ')
+
 class TreeCommand(BaseCommand):
     """Tree command"""
+    __slots__ = ()
     def execute(self, args):
-        print("TREE command is not fully implemented in this clone.")
+        flags = {a.upper() for a in args if a.startswith('/')}
+        paths = [a for a in args if not a.startswith('/')]
+        path = paths[0] if paths else '.'
+        
+        if not os.path.isdir(path):
+            print(f"Invalid path - {path}")
+            return
+        
+        glyphs = _TREE_GLYPHS_ASCII if '/A' in flags else _TREE_GLYPHS
+        out = ["Folder PATH listing", "Volume serial number is 0000-0000",
+               os.path.abspath(path)]
+        count = len(out)
+        out.extend(self._walk(path, '', '/F' in flags, glyphs))
+        if len(out) == count:
+            out.append("No subfolders exist")
+        
+        sys.stdout.write('\n'.join(out) + '\n')
+        
+    def _walk(self, path, prefix, show_files, glyphs):
+        """Yield tree lines below path; entry types come from the directory read"""
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name.lower())
+        except OSError:
+            return
+        
+        dirs = [e for e in entries if e.is_dir(follow_symlinks=False)]
+        
+        # With /F, files are listed before the subfolders
+        if show_files:
+            bar = glyphs[2] if dirs else '    '
+            files = [e.name for e in entries if not e.is_dir(follow_symlinks=False)]
+            for name in files:
+                yield prefix + bar + name
+            if files:
+                yield (prefix + bar).rstrip()
+        
+        for i, entry in enumerate(dirs):
+            last = i == len(dirs) - 1
+            yield prefix + (glyphs[1] if last else glyphs[0]) + entry.name
+            yield from self._walk(entry.path, prefix + ('    ' if last else glyphs[2]),
+                                  show_files, glyphs)
 
 class AttribCommand(BaseCommand):
     """Attrib command"""
+    __slots__ = ()
     def execute(self, args):
         print("ATTRIB command is not fully implemented in this clone.")
 
 class WhereCommand(BaseCommand):
     """Where command"""
+    __slots__ = ()
     def execute(self, args):
         print("WHERE command is not fully implemented in this clone.")
 
 class TaskListCommand(BaseCommand):
     """TaskList command"""
+    __slots__ = ()
     def execute(self, args):
         print("TASKLIST command is not fully implemented in this clone.")
 
 class TaskKillCommand(BaseCommand):
     """TaskKill command"""
+    __slots__ = ()
     def execute(self, args):
         print("TASKKILL command is not fully implemented in this clone.")
 
 class PingCommand(BaseCommand):
     """Ping command"""
+    __slots__ = ()
     def execute(self, args):
         if args:
             try:
-                subprocess.run(['ping'] + args, check=False)
+                # The child inherits our stdout/stderr directly
+                return subprocess.Popen([shutil.which('ping') or 'ping'] + args).wait()
             except:
                 print("PING command failed.")
         else:
@@ -419,16 +708,19 @@ class PingCommand(BaseCommand):
 
 class IpConfigCommand(BaseCommand):
     """IPConfig command"""
+    __slots__ = ()
     def execute(self, args):
         print("IPCONFIG command is not fully implemented in this clone.")
 
 class SystemInfoCommand(BaseCommand):
     """SystemInfo command"""
+    __slots__ = ()
     def execute(self, args):
         print("SYSTEMINFO command is not fully implemented in this clone.")
 
 class VolCommand(BaseCommand):
     """Vol command"""
+    __slots__ = ()
     def execute(self, args):
         drive = os.path.splitdrive(os.getcwd())[0]
         print(f" Volume in drive {drive} has no label.")
@@ -436,30 +728,36 @@ class VolCommand(BaseCommand):
 
 class LabelCommand(BaseCommand):
     """Label command"""
+    __slots__ = ()
     def execute(self, args):
         print("LABEL command is not fully implemented in this clone.")
 
 class ChkDskCommand(BaseCommand):
     """ChkDsk command"""
+    __slots__ = ()
     def execute(self, args):
         print("CHKDSK command is not fully implemented in this clone.")
 
 class FormatCommand(BaseCommand):
     """Format command"""
+    __slots__ = ()
     def execute(self, args):
         print("FORMAT command is not fully implemented in this clone.")
 
 class DiskPartCommand(BaseCommand):
     """DiskPart command"""
+    __slots__ = ()
     def execute(self, args):
         print("DISKPART command is not fully implemented in this clone.")
 
 class SfcCommand(BaseCommand):
     """SFC command"""
+    __slots__ = ()
     def execute(self, args):
         print("SFC command is not fully implemented in this clone.")
 
 class DismCommand(BaseCommand):
     """DISM command"""
+    __slots__ = ()
     def execute(self, args):
         print("DISM command is not fully implemented in this clone.")
\ No newline at end of file
@@ -3,6 +3,8 @@ Configuration Settings for Command Prompt
 """
 
 import os
+import functools
+from types import MappingProxyType
 
 class Config:
     """Configuration class for the CMD"""
@@ -20,7 +22,7 @@ class Config:
     MAX_COMMAND_LENGTH = 8192
     
     # File operations
-    DEFAULT_COPY_BUFFER_SIZE = 64 * 1024  # 64KB
+    DEFAULT_COPY_BUFFER_SIZE = 1024 * 1024  # 1MB
     
     # Directory listing settings
     DIR_DATE_FORMAT = "%m/%d/%Y  %I:%M %p"
@@ -56,7 +58,8 @@ class Config:
     }
     
     # File extensions that are executable
-    EXECUTABLE_EXTENSIONS = ['.exe', '.com', '.bat', '.cmd', '.msi', '.scr']
+    EXECUTABLE_EXTENSIONS = frozenset(['.exe', '.com', '.bat', '.cmd', '.msi', '.scr'])
+    _EXEC_EXT_TUPLE = tuple(sorted(EXECUTABLE_EXTENSIONS))  # for str.endswith
     
     # Default environment variables
     DEFAULT_ENV_VARS = {
@@ -143,8 +146,9 @@ class Config:
     MAX_FILES_WITHOUT_PAGING = 1000
     
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def get_default_env_vars(cls):
-        """Get default environment variables"""
+        """Get default environment variables (read-only, computed once)"""
         env_vars = cls.DEFAULT_ENV_VARS.copy()
         
         # Add system-specific defaults
@@ -157,7 +161,8 @@ class Config:
                 'TMP': os.environ.get('TMP', 'C:\\Windows\\Temp')
             })
         
-        return env_vars
+        # Callers that need to modify it should take a dict() copy
+        return MappingProxyType(env_vars)
     
     @classmethod
     def get_error_message(cls, error_type, *args):
@@ -176,8 +181,7 @@ class Config:
     @classmethod
     def is_executable_file(cls, filename):
         """Check if file is executable based on extension"""
-        _, ext = os.path.splitext(filename.lower())
-        return ext in cls.EXECUTABLE_EXTENSIONS
+        return filename.lower().endswith(cls._EXEC_EXT_TUPLE)
     
     @classmethod
     def get_command_alias(cls, command):
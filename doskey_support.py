@@ -4,53 +4,191 @@ Implements full DOSKEY functionality for the CMD
 """
 
 import os
+import re
 import sys
 import json
+import mmap
+import atexit
 import pickle
+import threading
+from bisect import bisect_left
 from pathlib import Path
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefer a faster JSON backend when one is installed; all return bytes
+try:
+    import orjson
+
+    def _dumps(obj, indent=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    _loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+
+        def _dumps(obj, indent=False):
+            return ujson.dumps(obj, indent=2 if indent else 0).encode('utf-8')
+        _loads = ujson.loads
+    except ImportError:
+        def _dumps(obj, indent=False):
+            return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+        _loads = json.loads
+
+# readline module once setup_readline_completion has installed it
+_readline = None
+
+# Per-user state directory, resolved and created once
+_CMD_DIR = Path.home() / '.cmd_clone'
+_CMD_DIR.mkdir(exist_ok=True)
+_HISTORY_FILE = _CMD_DIR / 'history.bin'
+# Earlier versions kept history as a JSON list under this name
+_LEGACY_HISTORY_NAME = 'command_history.json'
+_MACRO_FILE = _CMD_DIR / 'macros.json'
+
+# Macro placeholders: $1-$9, $* (all arguments), $$ (literal $), $T (separator)
+_MACRO_RE = re.compile(r'\$([1-9*$Tt])')
+
+def _substitute_macro(text, args, separator=None):
+    """Expand macro placeholders in one pass; $T becomes separator if given"""
+    def repl(m):
+        t = m.group(1)
+        if t == '*':
+            return ' '.join(args)
+        if t == '$':
+            return '$'
+        if t in 'Tt':
+            return m.group(0) if separator is None else separator
+        idx = int(t) - 1
+        return args[idx] if idx < len(args) else ''
+    return _MACRO_RE.sub(repl, text)
+
+def _read_mapped(path):
+    """Read a whole file through a read-only memory map"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+def _mapped_lines(path):
+    """Yield the raw lines of a file through a read-only memory map"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b'')
+
+def _history_frame(command):
+    """Encode a history entry as a little-endian length-prefixed UTF-8 frame"""
+    data = command.encode('utf-8')
+    return len(data).to_bytes(4, 'little') + data
+
+class _HistoryRing:
+    """Fixed-size history buffer with O(1) append and indexed access"""
+    
+    __slots__ = ('maxlen', '_buf', '_head', '_count')
+    
+    def __init__(self, maxlen, iterable=()):
+        self.maxlen = maxlen
+        self._buf = [None] * maxlen
+        self._head = 0
+        self._count = 0
+        self.extend(iterable)
+    
+    def append(self, item):
+        maxlen = self.maxlen
+        if self._count < maxlen:
+            self._buf[(self._head + self._count) % maxlen] = item
+            self._count += 1
+        else:
+            # Full: overwrite the oldest entry
+            self._buf[self._head] = item
+            self._head = (self._head + 1) % maxlen
+    
+    def extend(self, iterable):
+        for item in iterable:
+            self.append(item)
+    
+    def clear(self):
+        self._buf = [None] * self.maxlen
+        self._head = 0
+        self._count = 0
+    
+    def __len__(self):
+        return self._count
+    
+    def __getitem__(self, index):
+        count = self._count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('history index out of range')
+        return self._buf[(self._head + index) % self.maxlen]
+    
+    def to_list(self):
+        """Copy the entries oldest first; a single slice unless wrapped"""
+        head, end = self._head, self._head + self._count
+        if end <= self.maxlen:
+            return self._buf[head:end]
+        return self._buf[head:] + self._buf[:end - self.maxlen]
+    
+    def __iter__(self):
+        return iter(self.to_list())
 
 class DoskeyProcessor:
     """Handles DOSKEY command history and macros"""
     
     def __init__(self, max_history=50):
         self.max_history = max_history
-        self.command_history = deque(maxlen=max_history)
+        self.command_history = _HistoryRing(max_history)
+        # Lowercased copy of the history for searches, evicted in step
+        self._history_lower = _HistoryRing(max_history)
         self.macros = {}
         self.history_file = self.get_history_file()
         self.macro_file = self.get_macro_file()
         
         # Load existing history and macros
+        self._hfd = None
         self.load_history()
         self.load_macros()
         
+        # Macro changes are saved right away unless a bulk load is running
+        self._macros_dirty = False
+        self._autosave = True
+        
+        # History is an append-only log; one length-prefixed frame per command.
+        # Loading may already have opened it while compacting.
+        if self._hfd is None:
+            self._open_history_log()
+        atexit.register(self.close)
+        atexit.register(self.flush_macros)
+        
         # Current history position for navigation
         self.history_position = 0
     
     def get_history_file(self):
         """Get the path to the history file"""
-        home_dir = Path.home()
-        cmd_dir = home_dir / '.cmd_clone'
-        cmd_dir.mkdir(exist_ok=True)
-        return cmd_dir / 'command_history.json'
+        return _HISTORY_FILE
     
     def get_macro_file(self):
         """Get the path to the macro file"""
-        home_dir = Path.home()
-        cmd_dir = home_dir / '.cmd_clone'
-        cmd_dir.mkdir(exist_ok=True)
-        return cmd_dir / 'macros.json'
+        return _MACRO_FILE
     
     def add_command(self, command):
         """Add a command to history"""
         if command.strip() and (not self.command_history or self.command_history[-1] != command):
+            # Interned so repeated commands share one string
+            command = sys.intern(command)
             self.command_history.append(command)
+            self._history_lower.append(command.lower())
             self.history_position = len(self.command_history)
-            self.save_history()
+            self._append_history(command)
+            if _readline is not None:
+                _readline.add_history(command)
     
     def get_history(self):
         """Get the command history list"""
-        return list(self.command_history)
+        return self.command_history.to_list()
     
     def get_previous_command(self):
         """Get the previous command in history (Up arrow)"""
@@ -71,51 +209,117 @@ class DoskeyProcessor:
     
     def search_history(self, pattern):
         """Search command history for a pattern"""
-        matches = []
-        for i, command in enumerate(self.command_history):
-            if pattern.lower() in command.lower():
-                matches.append((i, command))
-        return matches
+        pattern = pattern.lower()
+        history = self.command_history
+        return [(i, history[i]) for i, command in enumerate(self._history_lower)
+                if pattern in command]
     
     def clear_history(self):
         """Clear command history"""
         self.command_history.clear()
+        self._history_lower.clear()
         self.history_position = 0
-        self.save_history()
+        self._compact()
+        if _readline is not None:
+            _readline.clear_history()
     
-    def save_history(self):
-        """Save command history to file"""
+    def _open_history_log(self):
+        """Open a raw append descriptor on the history log"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(list(self.command_history), f, indent=2)
+            self._hfd = os.open(str(self.history_file),
+                                os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0),
+                                0o600)
+        except OSError:
+            # Silently fail if we can't save history
+            self._hfd = None
+    
+    def close(self):
+        """Flush the history log to disk and close it"""
+        if self._hfd is not None:
+            try:
+                os.fsync(self._hfd)
+            except OSError:
+                pass
+            os.close(self._hfd)
+            self._hfd = None
+    
+    def _append_history(self, command):
+        """Append one command to the history log"""
+        if self._hfd is None:
+            return
+        try:
+            os.write(self._hfd, _history_frame(command))
+        except OSError:
+            # Silently fail if we can't save history
+            pass
+    
+    def _compact(self):
+        """Rewrite the history log from the in-memory history"""
+        self.close()
+        try:
+            with open(self.history_file, 'wb') as f:
+                f.writelines(_history_frame(command) for command in self.command_history)
         except Exception as e:
             # Silently fail if we can't save history
             pass
+        self._open_history_log()
     
     def load_history(self):
         """Load command history from file"""
         try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history_data = json.load(f)
-                    for command in history_data:
-                        self.command_history.append(command)
-                    self.history_position = len(self.command_history)
+            if not self.history_file.exists():
+                self._import_legacy_history()
+            else:
+                data = _read_mapped(self.history_file)
+                frames = 0
+                pos = 0
+                size = len(data)
+                while pos + 4 <= size:
+                    end = pos + 4 + int.from_bytes(data[pos:pos + 4], 'little')
+                    if end > size:
+                        # Torn final write; drop it
+                        break
+                    self.command_history.append(sys.intern(data[pos + 4:end].decode('utf-8')))
+                    frames += 1
+                    pos = end
+                self._history_lower.extend(c.lower() for c in self.command_history)
+                self.history_position = len(self.command_history)
+                
+                # Compact the log once it holds far more than we keep
+                if frames > 2 * self.max_history:
+                    self._compact()
         except Exception as e:
             # Silently fail if we can't load history
             pass
     
+    def _import_legacy_history(self):
+        """Carry over history from the old JSON file on first load"""
+        legacy = self.history_file.with_name(_LEGACY_HISTORY_NAME)
+        if not legacy.exists():
+            return
+        history_data = _loads(_read_mapped(legacy) or b'[]')
+        self.command_history.extend(sys.intern(c) for c in history_data if isinstance(c, str))
+        self._history_lower.extend(c.lower() for c in self.command_history)
+        self.history_position = len(self.command_history)
+        
+        # Writing history.bin means the JSON file is not read again
+        self._compact()
+    
     def add_macro(self, name, definition):
         """Add a DOSKEY macro"""
-        self.macros[name.lower()] = definition
-        self.save_macros()
+        self.macros[sys.intern(name.lower())] = definition
+        self._macros_dirty = True
+        if self._autosave:
+            self.save_macros()
     
     def remove_macro(self, name):
         """Remove a DOSKEY macro"""
         name_lower = name.lower()
         if name_lower in self.macros:
             del self.macros[name_lower]
-            self.save_macros()
+            self._macros_dirty = True
+            if self._autosave:
+                self.save_macros()
             return True
         return False
     
@@ -129,45 +333,44 @@ class DoskeyProcessor:
     
     def expand_macro(self, command_line):
         """Expand macros in a command line"""
+        macros = self.macros
+        if not macros:
+            return command_line
+        
         parts = command_line.split()
         if not parts:
             return command_line
         
-        command = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
-        
-        if command in self.macros:
-            macro_def = self.macros[command]
-            
-            # Replace parameters $1, $2, etc. with actual arguments
-            for i, arg in enumerate(args, 1):
-                macro_def = macro_def.replace(f'${i}', arg)
-            
-            # Replace $* with all arguments
-            macro_def = macro_def.replace('$*', ' '.join(args))
-            
-            # Replace $$ with $
-            macro_def = macro_def.replace('$$', '$')
-            
-            return macro_def
+        # Keys are stored lowercased, so one fold of the command suffices
+        macro_def = macros.get(parts[0].lower())
+        if macro_def is not None:
+            if '$' not in macro_def:
+                return macro_def
+            return _substitute_macro(macro_def, parts[1:])
         
         return command_line
     
     def save_macros(self):
         """Save macros to file"""
         try:
-            with open(self.macro_file, 'w', encoding='utf-8') as f:
-                json.dump(self.macros, f, indent=2)
+            with open(self.macro_file, 'wb') as f:
+                f.write(_dumps(self.macros, indent=True))
+            self._macros_dirty = False
         except Exception as e:
             # Silently fail if we can't save macros
             pass
     
+    def flush_macros(self):
+        """Save macros if they changed since the last save"""
+        if self._macros_dirty:
+            self.save_macros()
+    
     def load_macros(self):
         """Load macros from file"""
         try:
             if self.macro_file.exists():
-                with open(self.macro_file, 'r', encoding='utf-8') as f:
-                    self.macros = json.load(f)
+                macros = _loads(_read_mapped(self.macro_file))
+                self.macros = {sys.intern(name): text for name, text in macros.items()}
         except Exception as e:
             # Silently fail if we can't load macros
             pass
@@ -262,8 +465,10 @@ class DoskeyProcessor:
         if 1 <= size <= 999:
             self.max_history = size
             # Adjust current history if needed
-            while len(self.command_history) > size:
-                self.command_history.popleft()
+            self.command_history = _HistoryRing(size, self.command_history)
+            self._history_lower = _HistoryRing(size, (c.lower() for c in self.command_history))
+            self.history_position = len(self.command_history)
+            self._compact()
             print(f"History buffer size set to {size}")
         else:
             print("Invalid history size. Must be between 1 and 999.")
@@ -271,8 +476,12 @@ class DoskeyProcessor:
     def reinstall_doskey(self):
         """Reinstall DOSKEY (clear everything)"""
         self.command_history.clear()
+        self._history_lower.clear()
         self.macros.clear()
         self.history_position = 0
+        self._compact()
+        if _readline is not None:
+            _readline.clear_history()
         print("DOSKEY reinstalled.")
     
     def display_macros(self, exe=None):
@@ -289,10 +498,10 @@ class DoskeyProcessor:
     
     def parse_macro_definition(self, definition):
         """Parse a macro definition (name=text)"""
-        if '=' not in definition:
+        name, sep, text = definition.partition('=')
+        if not sep:
             return
         
-        name, text = definition.split('=', 1)
         name = name.strip()
         
         if not name:
@@ -311,17 +520,22 @@ class DoskeyProcessor:
     
     def load_macro_file(self, filename):
         """Load macros from a file"""
+        # One save for the whole file instead of one per macro
+        self._autosave = False
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and '=' in line:
-                        self.parse_macro_definition(line)
+            for line in _mapped_lines(filename):
+                # Skip blank and non-definition lines before decoding
+                if b'=' not in line:
+                    continue
+                self.parse_macro_definition(line.decode('utf-8').strip())
             print(f"Macros loaded from {filename}")
         except FileNotFoundError:
             print(f"Cannot find file: {filename}")
         except Exception as e:
             print(f"Error loading macros: {e}")
+        finally:
+            self._autosave = True
+            self.flush_macros()
 
 class CommandLineEditor:
     """Enhanced command line editing with DOSKEY support"""
@@ -334,20 +548,8 @@ class CommandLineEditor:
     
     def get_input(self, prompt):
         """Get input with enhanced editing capabilities"""
-        try:
-            # Try to use readline if available for better editing
-            import readline
-            
-            # Set up readline with history
-            readline.clear_history()
-            for command in self.doskey.get_history():
-                readline.add_history(command)
-            
-            line = input(prompt)
-            
-        except ImportError:
-            # Fallback to regular input
-            line = input(prompt)
+        # readline, when available, is set up once and fed by add_command
+        line = input(prompt)
         
         # Add to DOSKEY history
         if line.strip():
@@ -435,11 +637,82 @@ class CommandLineEditor:
         
         return ""
 
+# Lowercased executable names on PATH, sorted for prefix search, and the
+# (directory, mtime) signature of PATH they were built from
+_PATH_INDEX = None
+_PATH_SIG = None
+_PATH_EXTS = frozenset(['.exe', '.com', '.bat', '.cmd'])
+_PATH_LOCK = threading.Lock()
+
+def _scan_path_dir(directory):
+    """Lowercased executable names in one PATH directory"""
+    names = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                name, ext = os.path.splitext(entry.name)
+                if ext.lower() in _PATH_EXTS:
+                    names.append(name.lower())
+    except OSError:
+        pass
+    return names
+
+def _path_command_index():
+    """Get the PATH executable index, rebuilding it if PATH changed"""
+    global _PATH_INDEX, _PATH_SIG
+    
+    sig = []
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        if directory:
+            try:
+                sig.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                continue
+    sig = tuple(sig)
+    
+    with _PATH_LOCK:
+        if sig != _PATH_SIG:
+            # Directory listings are I/O bound, so scan them concurrently
+            names = set()
+            if sig:
+                directories = [directory for directory, _ in sig]
+                with ThreadPoolExecutor(max_workers=min(32, len(directories))) as pool:
+                    for found in pool.map(_scan_path_dir, directories):
+                        names.update(found)
+            _PATH_INDEX = sorted(names)
+            _PATH_SIG = sig
+        
+        return _PATH_INDEX
+
+def _warm_path_index():
+    """Build the PATH index in the background; the shell may exit first"""
+    try:
+        _path_command_index()
+    except RuntimeError:
+        # Executor refused work during interpreter shutdown
+        pass
+
 class TabCompletion:
     """Tab completion for file names and commands"""
     
     def __init__(self, command_processor):
         self.command_processor = command_processor
+        self._builtin_sorted = ()
+        self._builtin_version = None
+        
+        # Build the PATH index in the background so the first TAB is instant
+        threading.Thread(target=_warm_path_index, daemon=True).start()
+    
+    def _builtin_index(self):
+        """Get the sorted upper-cased builtin names, rebuilt when commands are added"""
+        commands = self.command_processor.builtin_commands
+        version = getattr(commands, 'version', None)
+        if version is None:
+            version = len(commands)
+        if version != self._builtin_version:
+            self._builtin_sorted = tuple(sorted(set(c.upper() for c in commands)))
+            self._builtin_version = version
+        return self._builtin_sorted
     
     def complete_command(self, text, line, begidx, endidx):
         """Complete command names and file paths"""
@@ -457,25 +730,21 @@ class TabCompletion:
         """Complete command names"""
         completions = []
         
-        # Built-in commands
-        for cmd in self.command_processor.builtin_commands.keys():
-            if cmd.startswith(text.lower()):
-                completions.append(cmd.upper())
+        # Built-in commands - binary search to the first name with the prefix
+        upper = text.upper()
+        index = self._builtin_index()
+        i = bisect_left(index, upper)
+        while i < len(index) and index[i].startswith(upper):
+            completions.append(index[i])
+            i += 1
         
-        # Executables in PATH
-        path_dirs = os.environ.get('PATH', '').split(os.pathsep)
-        for directory in path_dirs:
-            if not os.path.isdir(directory):
-                continue
-            
-            try:
-                for filename in os.listdir(directory):
-                    name, ext = os.path.splitext(filename)
-                    if (ext.lower() in ['.exe', '.com', '.bat', '.cmd'] and 
-                        name.lower().startswith(text.lower())):
-                        completions.append(name.upper())
-            except (OSError, PermissionError):
-                continue
+        # Executables in PATH - binary search to the first name with the prefix
+        prefix = text.lower()
+        index = _path_command_index()
+        i = bisect_left(index, prefix)
+        while i < len(index) and index[i].startswith(prefix):
+            completions.append(index[i].upper())
+            i += 1
         
         return sorted(set(completions))
     
@@ -499,15 +768,16 @@ class TabCompletion:
             filename = text
         
         try:
-            # List files and directories
-            if os.path.isdir(directory):
-                for item in os.listdir(directory):
-                    if item.lower().startswith(filename.lower()):
-                        full_path = os.path.join(directory, item)
-                        if os.path.isdir(full_path):
-                            completions.append(quote_prefix + full_path + os.path.sep)
+            # List files and directories; scandir entries carry their type,
+            # so only symlinks cost an extra stat
+            filename_lower = filename.lower()
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.lower().startswith(filename_lower):
+                        if entry.is_dir():
+                            completions.append(quote_prefix + entry.path + os.path.sep)
                         else:
-                            completions.append(quote_prefix + full_path)
+                            completions.append(quote_prefix + entry.path)
         except (OSError, PermissionError):
             pass
         
@@ -515,6 +785,7 @@ class TabCompletion:
 
 def setup_readline_completion(command_processor, doskey_processor):
     """Set up readline with tab completion and history"""
+    global _readline
     try:
         import readline
         import rlcompleter
@@ -526,10 +797,14 @@ def setup_readline_completion(command_processor, doskey_processor):
         readline.set_completer(tab_completion.complete_command)
         readline.parse_and_bind("tab: complete")
         
-        # Set up history
+        # Set up history once; add_command appends from here on, so
+        # readline must not add input lines itself
         readline.clear_history()
         for command in doskey_processor.get_history():
             readline.add_history(command)
+        if hasattr(readline, 'set_auto_history'):
+            readline.set_auto_history(False)
+        _readline = readline
         
         # Configure readline behavior
         readline.parse_and_bind("set editing-mode emacs")
@@ -550,23 +825,11 @@ class MacroExpander:
     
     def expand_advanced_macro(self, macro_text, args):
         """Expand macro with advanced features"""
-        result = macro_text
-        
-        # Replace parameters $1-$9
-        for i, arg in enumerate(args, 1):
-            if i <= 9:
-                result = result.replace(f'${i}', arg)
+        if '$' not in macro_text:
+            return [macro_text]
         
-        # Replace $* with all arguments
-        result = result.replace('$*', ' '.join(args))
-        
-        # Handle command separator $T
-        commands = result.split('$T')
-        
-        # Replace $$ with $
-        commands = [cmd.replace('$$', '$') for cmd in commands]
-        
-        return commands
+        # $T separators become NULs, which cannot occur in a command line
+        return _substitute_macro(macro_text, args, '\0').split('\0')
     
     def execute_macro(self, name, args, command_processor):
         """Execute a macro with the given arguments"""
@@ -605,15 +868,18 @@ def integrate_doskey_support(command_processor):
     
     def enhanced_process_command(command_line):
         """Enhanced command processing with macro expansion"""
-        # First check if it's a macro
-        parts = command_line.split()
-        if parts:
-            command = parts[0].lower()
-            args = parts[1:] if len(parts) > 1 else []
+        # First check if it's a macro; skip the split when none are defined
+        macros = doskey_processor.macros
+        if macros:
+            line = command_line.lstrip()
+            sp = line.find(' ')
+            command = (line if sp < 0 else line[:sp]).lower()
             
-            # Try to execute as macro
-            if macro_expander.execute_macro(command, args, command_processor):
-                return
+            # Try to execute as macro; arguments are only split on a hit
+            if command in macros:
+                args = line[sp + 1:].split() if sp >= 0 else []
+                if macro_expander.execute_macro(command, args, command_processor):
+                    return
         
         # Regular command processing
         return original_process(command_line)
@@ -7,42 +7,128 @@ import os
 import sys
 import shutil
 import datetime
-import platform
 import subprocess
-import glob
-import stat
-import socket
-import tempfile
-import threading
 import time
+import errno
+import mmap
 import re
-import json
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from commands import BaseCommand
 
+# Whether each external tool exists on PATH, probed once per name so
+# commands without the tool go straight to their built-in fallback
+_AVAILABLE = {}
+
+def _available(name):
+    """Check whether an executable can be found on PATH"""
+    found = _AVAILABLE.get(name)
+    if found is None:
+        found = _AVAILABLE[name] = shutil.which(name) is not None
+    return found
+
+# Windows has no descriptors to sweep, and close_fds=True there takes a
+# slower CreateProcess path; keep POSIX on the safe default
+_POPEN_KW = {'close_fds': os.name != 'nt'}
+
+def _run(argv):
+    """Run a console tool in the foreground and wait for it"""
+    return subprocess.run(argv, check=False, **_POPEN_KW)
+
+def _detach_launch(exe, args):
+    """Start a Windows GUI program without waiting for it or wiring up pipes"""
+    if not args:
+        # ShellExecute directly; no intermediate process bookkeeping
+        os.startfile(exe)
+    else:
+        # DETACHED_PROCESS | CREATE_NEW_PROCESS_GROUP: Ctrl+C in this
+        # console is not delivered to the launched program
+        subprocess.Popen([exe, *args], creationflags=0x00000208, **_POPEN_KW)
+
+@functools.lru_cache(maxsize=4)
+def _format_time(sec, fmt):
+    return datetime.datetime.fromtimestamp(sec).strftime(fmt)
+
+def _format_now(fmt):
+    """Format the current time; repeated calls within a second hit the cache"""
+    return _format_time(int(time.time()), fmt)
+
+_LINESEP = os.linesep.encode('ascii')
+
+def _write_bytes(data):
+    """Write prebuilt ASCII text to stdout; straight to the descriptor when
+    stdout has not been swapped for redirection or a pipe"""
+    out = sys.stdout
+    if out is sys.__stdout__:
+        out.flush()
+        fd = out.fileno()
+        # os.write skips the text layer, so translate newlines like print does
+        if _LINESEP != b'\n':
+            data = data.replace(b'\n', _LINESEP)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    else:
+        out.write(data.decode('ascii'))
+
+class PassthroughCommand(BaseCommand):
+    """Runs an external tool of the same name, or prints canned output
+    when the tool is not installed"""
+    
+    __slots__ = ('exe', 'fallback', 'usage')
+    
+    def __init__(self, exe, fallback=b'', usage=b''):
+        self.exe = exe
+        self.fallback = fallback
+        self.usage = usage
+    
+    def execute(self, args):
+        if _available(self.exe):
+            return _run([self.exe, *args]).returncode
+        
+        text = self.fallback
+        if not args or args[0] == '/?':
+            text += self.usage
+        _write_bytes(text)
+
+def _prompt(text):
+    """Show a prompt and read one line of input, like input() without
+    going through print or readline"""
+    out = sys.stdout
+    out.write(text)
+    out.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\r\n')
+
 # Network Commands
 class TracertCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Usage: tracert [-d] [-h maximum_hops] [-j host_list] [-w timeout] target_name")
             return
-        try:
-            subprocess.run(['tracert'] + args, check=False)
-        except:
+        if _available('tracert'):
+            _run(['tracert', *args])
+        else:
             print("Tracing route to", args[0] if args else "unknown")
             print("Unable to resolve target system name", args[0] if args else "")
 
 class PathpingCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Usage: pathping [-n] [-h maximum_hops] [-g host_list] [-p period] [-q num_queries] target_name")
             return
-        try:
-            subprocess.run(['pathping'] + args, check=False)
-        except:
+        if _available('pathping'):
+            _run(['pathping', *args])
+        else:
             print("Pathping functionality not available on this system")
 
 class NslookupCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Default Server:  UnKnown")
@@ -50,78 +136,83 @@ class NslookupCommand(BaseCommand):
             print()
             print("> ", end="")
             return
-        try:
-            subprocess.run(['nslookup'] + args, check=False)
-        except:
+        if _available('nslookup'):
+            _run(['nslookup', *args])
+        else:
             print(f"*** Can't find {args[0]}: Non-existent domain")
 
-class ArpCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['arp'] + args, check=False)
-        except:
-            print("Interface: 192.168.1.100 --- 0x2")
-            print("  Internet Address      Physical Address      Type")
-            print("  192.168.1.1           aa-bb-cc-dd-ee-ff     dynamic")
+_ARP_FALLBACK = (
+    b"Interface: 192.168.1.100 --- 0x2\n"
+    b"  Internet Address      Physical Address      Type\n"
+    b"  192.168.1.1           aa-bb-cc-dd-ee-ff     dynamic\n"
+)
 
-class NetstatCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['netstat'] + args, check=False)
-        except:
-            print("Active Connections")
-            print()
-            print("  Proto  Local Address          Foreign Address        State")
+_NETSTAT_FALLBACK = (
+    b"Active Connections\n"
+    b"\n"
+    b"  Proto  Local Address          Foreign Address        State\n"
+)
 
-class RouteCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['route'] + args, check=False)
-        except:
-            print("Network Destination        Netmask          Gateway       Interface  Metric")
-            print("          0.0.0.0          0.0.0.0      192.168.1.1    192.168.1.100     25")
+_ROUTE_FALLBACK = (
+    b"Network Destination        Netmask          Gateway       Interface  Metric\n"
+    b"          0.0.0.0          0.0.0.0      192.168.1.1    192.168.1.100     25\n"
+)
 
 class TelnetCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("Telnet is not enabled by default in Windows 10.")
         print("To enable telnet, run: dism /online /Enable-Feature /FeatureName:TelnetClient")
 
 class FtpCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("ftp> ", end="")
             return
-        try:
-            subprocess.run(['ftp'] + args, check=False)
-        except:
+        if _available('ftp'):
+            _run(['ftp', *args])
+        else:
             print("ftp: connect: Connection refused")
 
 class NetshCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        try:
-            subprocess.run(['netsh'] + args, check=False)
-        except:
+        if _available('netsh'):
+            _run(['netsh', *args])
+        else:
             print("The following commands are available:")
             print("Commands in this context:")
             print("advfirewall - Changes to the 'netsh advfirewall' context.")
             print("interface   - Changes to the 'netsh interface' context.")
 
 # System Information Commands
+# Neither changes during a session, so resolve them once
+@functools.lru_cache(maxsize=None)
+def _hostname():
+    """Look the host name up once; socket is only imported if asked"""
+    import socket
+    return socket.gethostname() + "\n"
+
+_WHOAMI = f"{os.environ.get('USERDOMAIN', 'WORKGROUP')}\\{os.environ.get('USERNAME', 'user')}\n"
+
 class HostnameCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        print(socket.gethostname())
+        sys.stdout.write(_hostname())
 
 class WhoamiCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        try:
-            subprocess.run(['whoami'] + args, check=False)
-        except:
-            print(f"{os.environ.get('USERDOMAIN', 'WORKGROUP')}\\{os.environ.get('USERNAME', 'user')}")
+        if _available('whoami'):
+            _run(['whoami', *args])
+        else:
+            sys.stdout.write(_WHOAMI)
 
 class LogoffCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        print("Are you sure you want to log off? (Y/N): ", end="")
-        response = input()
+        response = _prompt("Are you sure you want to log off? (Y/N): ")
         if response.lower() in ['y', 'yes']:
             print("Logging off...")
         else:
@@ -129,13 +220,14 @@ class LogoffCommand(BaseCommand):
 
 # Process Management Commands  
 class StartCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Starts a separate window to run a specified program or command.")
             return
         try:
             if os.name == 'nt':
-                subprocess.Popen(['start'] + args, shell=True)
+                subprocess.Popen(['start', *args], shell=True)
             else:
                 subprocess.Popen(args)
             print(f"Started: {' '.join(args)}")
@@ -143,6 +235,7 @@ class StartCommand(BaseCommand):
             print(f"Failed to start: {e}")
 
 class CallCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Calls one batch program from another.")
@@ -150,7 +243,37 @@ class CallCommand(BaseCommand):
         # In a real implementation, this would handle batch file calls
         print(f"Calling: {' '.join(args)}")
 
+def _wait_for_key(seconds):
+    """Wait up to seconds for console input; True if a key arrived"""
+    if os.name == 'nt':
+        import msvcrt
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if msvcrt.kbhit():
+                msvcrt.getwch()
+                return True
+            time.sleep(0.05)
+        return False
+    
+    try:
+        interactive = sys.stdin.isatty()
+    except (AttributeError, ValueError):
+        interactive = False
+    if not interactive:
+        time.sleep(seconds)
+        return False
+    
+    import select
+    if select.select([sys.stdin], [], [], seconds)[0]:
+        # The terminal delivers whole lines; consume the one typed
+        sys.stdin.readline()
+        return True
+    return False
+
+_TIMEOUT_RE = re.compile(r'(?<!\S)(?:/T\s+)?(-?\d+)(?!\S)|(?<!\S)(/NOBREAK)(?!\S)', re.I)
+
 class TimeoutCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("TIMEOUT [/T] timeout [/NOBREAK]")
@@ -159,32 +282,34 @@ class TimeoutCommand(BaseCommand):
         timeout_val = 10
         nobreak = False
         
-        i = 0
-        while i < len(args):
-            if args[i].upper() == '/T' and i + 1 < len(args):
-                try:
-                    timeout_val = int(args[i + 1])
-                    i += 2
-                except:
-                    i += 1
-            elif args[i].upper() == '/NOBREAK':
-                nobreak = True
-                i += 1
+        # One regex pass over the joined arguments; non-numbers are skipped
+        for m in _TIMEOUT_RE.finditer(' '.join(args)):
+            if m.group(1):
+                timeout_val = int(m.group(1))
             else:
-                try:
-                    timeout_val = int(args[i])
-                except:
-                    pass
-                i += 1
+                nobreak = True
         
-        print(f"Waiting for {timeout_val} seconds, press a key to continue ...")
-        for remaining in range(timeout_val, 0, -1):
-            print(f"\r{remaining} ", end="", flush=True)
-            time.sleep(1)
-        print("\r ")
+        out = sys.stdout
+        out.write(f"Waiting for {timeout_val} seconds, press a key to continue ...\n")
+        # Countdown frames are built up front; each tick is one write and
+        # one wait that a key press cuts short unless /NOBREAK was given
+        for frame in [f"\r{remaining} " for remaining in range(timeout_val, 0, -1)]:
+            out.write(frame)
+            out.flush()
+            if nobreak:
+                time.sleep(1)
+            elif _wait_for_key(1.0):
+                break
+        out.write("\r \n")
 
 # Registry Commands
+_REG_MESSAGES = {
+    'QUERY': "Registry query operations require administrative privileges.",
+    'ADD': "Registry add operations require administrative privileges.",
+}
+
 class RegCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("REG Operation [Parameter List]")
@@ -195,18 +320,17 @@ class RegCommand(BaseCommand):
             return
         
         operation = args[0].upper()
-        if operation == 'QUERY':
-            print("Registry query operations require administrative privileges.")
-        elif operation == 'ADD':
-            print("Registry add operations require administrative privileges.")
-        else:
-            print(f"Registry {operation} operations require administrative privileges.")
+        message = _REG_MESSAGES.get(operation)
+        if message is None:
+            message = f"Registry {operation} operations require administrative privileges."
+        print(message)
 
 class RegeditCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['regedit'] + args)
+                _detach_launch('regedit', args)
                 print("Registry Editor launched.")
             else:
                 print("Registry Editor is not available on this platform.")
@@ -214,35 +338,40 @@ class RegeditCommand(BaseCommand):
             print("Unable to launch Registry Editor.")
 
 # Service Management Commands
+_SC_HELP = (
+    b"DESCRIPTION:\n"
+    b"        SC is a command line program used for communicating with the\n"
+    b"        Service Control Manager and services.\n"
+    b"USAGE:\n"
+    b"        sc <server> [command] [service name] <option1> <option2>...\n"
+    b"\n"
+    b"        The option <server> has the form \"\\\\ServerName\"\n"
+    b"        Further help on commands can be obtained by typing: \"sc [command]\"\n"
+    b"        Commands:\n"
+    b"          query-----------Queries the status for a service, or\n"
+    b"                          enumerates the status for types of services.\n"
+    b"          queryex---------Queries the extended status for a service, or\n"
+    b"                          enumerates the status for types of services.\n"
+    b"          start-----------Starts a service.\n"
+    b"          pause-----------Sends a PAUSE control request to a service.\n"
+    b"          interrogate-----Sends an INTERROGATE control request to a service.\n"
+    b"          continue--------Sends a CONTINUE control request to a service.\n"
+    b"          stop------------Sends a STOP request to a service.\n"
+    b"          config----------Changes the configuration of a service (persistent).\n"
+    b"          description-----Changes the description of a service.\n"
+    b"          failure---------Changes the actions taken by a service upon failure.\n"
+)
+
 class ScCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
-            print("DESCRIPTION:")
-            print("        SC is a command line program used for communicating with the")
-            print("        Service Control Manager and services.")
-            print("USAGE:")
-            print("        sc <server> [command] [service name] <option1> <option2>...")
-            print()
-            print("        The option <server> has the form \"\\\\ServerName\"")
-            print("        Further help on commands can be obtained by typing: \"sc [command]\"")
-            print("        Commands:")
-            print("          query-----------Queries the status for a service, or")
-            print("                          enumerates the status for types of services.")
-            print("          queryex---------Queries the extended status for a service, or")
-            print("                          enumerates the status for types of services.")
-            print("          start-----------Starts a service.")
-            print("          pause-----------Sends a PAUSE control request to a service.")
-            print("          interrogate-----Sends an INTERROGATE control request to a service.")
-            print("          continue--------Sends a CONTINUE control request to a service.")
-            print("          stop------------Sends a STOP request to a service.")
-            print("          config----------Changes the configuration of a service (persistent).")
-            print("          description-----Changes the description of a service.")
-            print("          failure---------Changes the actions taken by a service upon failure.")
+            _write_bytes(_SC_HELP)
             return
         
-        try:
-            subprocess.run(['sc'] + args, check=False)
-        except:
+        if _available('sc'):
+            _run(['sc', *args])
+        else:
             command = args[0].upper() if args else ''
             if command == 'QUERY':
                 print("SERVICE_NAME: Spooler")
@@ -255,20 +384,25 @@ class ScCommand(BaseCommand):
             else:
                 print(f"Service control operations require administrative privileges.")
 
+_NET_HELP = (
+    b"The syntax of this command is:\n"
+    b"\n"
+    b"NET\n"
+    b"    [ ACCOUNTS | COMPUTER | CONFIG | CONTINUE | FILE | GROUP | HELP |\n"
+    b"      HELPMSG | LOCALGROUP | PAUSE | SESSION | SHARE | START |\n"
+    b"      STATISTICS | STOP | TIME | USE | USER | VIEW ]\n"
+)
+
 class NetCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
-            print("The syntax of this command is:")
-            print()
-            print("NET")
-            print("    [ ACCOUNTS | COMPUTER | CONFIG | CONTINUE | FILE | GROUP | HELP |")
-            print("      HELPMSG | LOCALGROUP | PAUSE | SESSION | SHARE | START |")
-            print("      STATISTICS | STOP | TIME | USE | USER | VIEW ]")
+            _write_bytes(_NET_HELP)
             return
         
-        try:
-            subprocess.run(['net'] + args, check=False)
-        except:
+        if _available('net'):
+            _run(['net', *args])
+        else:
             subcommand = args[0].upper()
             if subcommand == 'USER':
                 print("User accounts for \\\\COMPUTER-NAME")
@@ -277,29 +411,26 @@ class NetCommand(BaseCommand):
                 print("Administrator            DefaultAccount           Guest")
                 print("The command completed successfully.")
             elif subcommand == 'TIME':
-                print("Current time at \\\\COMPUTER-NAME is", datetime.datetime.now().strftime("%m/%d/%Y %I:%M:%S %p"))
+                print("Current time at \\\\COMPUTER-NAME is", _format_now("%m/%d/%Y %I:%M:%S %p"))
             else:
                 print("This command requires administrative privileges.")
 
 # System Utilities
-class PowercfgCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['powercfg'] + args, check=False)
-        except:
-            if not args or args[0] == '/?':
-                print("POWERCFG /COMMAND [ARGUMENTS]")
-                print()
-                print("  /LIST, /L          Lists all power schemes.")
-                print("  /QUERY, /Q         Displays the contents of a power scheme.")
-                print("  /CHANGE, /X        Modifies a setting value in the current power scheme.")
-                print("  /HIBERNATE, /H     Enables/disables the hibernate feature.")
+_POWERCFG_HELP = (
+    b"POWERCFG /COMMAND [ARGUMENTS]\n"
+    b"\n"
+    b"  /LIST, /L          Lists all power schemes.\n"
+    b"  /QUERY, /Q         Displays the contents of a power scheme.\n"
+    b"  /CHANGE, /X        Modifies a setting value in the current power scheme.\n"
+    b"  /HIBERNATE, /H     Enables/disables the hibernate feature.\n"
+)
 
 class MsconfigCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['msconfig'] + args)
+                _detach_launch('msconfig', args)
                 print("System Configuration utility launched.")
             else:
                 print("System Configuration utility is not available on this platform.")
@@ -307,10 +438,11 @@ class MsconfigCommand(BaseCommand):
             print("Unable to launch System Configuration utility.")
 
 class Msinfo32Command(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['msinfo32'] + args)
+                _detach_launch('msinfo32', args)
                 print("System Information launched.")
             else:
                 print("System Information is not available on this platform.")
@@ -318,10 +450,11 @@ class Msinfo32Command(BaseCommand):
             print("Unable to launch System Information.")
 
 class EventvwrCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['eventvwr'] + args)
+                _detach_launch('eventvwr', args)
                 print("Event Viewer launched.")
             else:
                 print("Event Viewer is not available on this platform.")
@@ -329,10 +462,11 @@ class EventvwrCommand(BaseCommand):
             print("Unable to launch Event Viewer.")
 
 class PerfmonCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['perfmon'] + args)
+                _detach_launch('perfmon', args)
                 print("Performance Monitor launched.")
             else:
                 print("Performance Monitor is not available on this platform.")
@@ -341,6 +475,7 @@ class PerfmonCommand(BaseCommand):
 
 # Environment Commands
 class SetxCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("ERROR: Invalid syntax.")
@@ -357,32 +492,42 @@ class SetxCommand(BaseCommand):
             print(f"Setting environment variable {var_name}={var_value}")
             print("SUCCESS: Specified value was saved.")
 
+_MODE_HELP = (
+    b"Configures system devices.\n"
+    b"\n"
+    b"Serial port:     MODE COMm[:] [BAUD=b] [PARITY=p] [DATA=d] [STOP=s]\n"
+    b"Device Status:   MODE [device] [/STATUS]\n"
+    b"Redirect printing: MODE LPTn[:]=COMm[:]\n"
+    b"Select code page: MODE CON[:] CP SELECT=yyy\n"
+    b"Code page status: MODE CON[:] CP [/STATUS]\n"
+    b"Display mode:    MODE CON[:] [COLS=c] [LINES=n]\n"
+    b"Typematic rate:  MODE CON[:] [RATE=r DELAY=d]\n"
+)
+
+_MODE_CON_STATUS = (
+    b"Status for device CON:\n"
+    b"    Lines:          25\n"
+    b"    Columns:        80\n"
+    b"    Keyboard rate:  31\n"
+    b"    Keyboard delay: 1\n"
+    b"    Code page:      437\n"
+)
+
 class ModeCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
-            print("Configures system devices.")
-            print()
-            print("Serial port:     MODE COMm[:] [BAUD=b] [PARITY=p] [DATA=d] [STOP=s]")
-            print("Device Status:   MODE [device] [/STATUS]")
-            print("Redirect printing: MODE LPTn[:]=COMm[:]")
-            print("Select code page: MODE CON[:] CP SELECT=yyy")
-            print("Code page status: MODE CON[:] CP [/STATUS]")
-            print("Display mode:    MODE CON[:] [COLS=c] [LINES=n]")
-            print("Typematic rate:  MODE CON[:] [RATE=r DELAY=d]")
+            _write_bytes(_MODE_HELP)
             return
         
         if args[0].upper() == 'CON':
             if len(args) > 1:
                 print("Console settings updated.")
             else:
-                print("Status for device CON:")
-                print("    Lines:          25")
-                print("    Columns:        80")
-                print("    Keyboard rate:  31")
-                print("    Keyboard delay: 1")
-                print("    Code page:      437")
+                _write_bytes(_MODE_CON_STATUS)
 
 class ChcpCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Active code page: 437")
@@ -395,69 +540,75 @@ class ChcpCommand(BaseCommand):
 
 # Console Operations
 class PauseCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        print("Press any key to continue . . . ", end="")
-        input()
+        _prompt("Press any key to continue . . . ")
+
+_CHOICE_RE = re.compile(r'(?<!\S)/C\s+("[^"]*"|\S+)|(?<!\S)/M\s+("[^"]*"|\S+)', re.I)
 
 class ChoiceCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         choices = "YN"
         prompt = "[Y,N]?"
         
-        i = 0
-        while i < len(args):
-            if args[i].upper() == '/C' and i + 1 < len(args):
-                choices = args[i + 1].upper()
-                i += 2
-            elif args[i].upper() == '/M' and i + 1 < len(args):
-                prompt = args[i + 1]
-                i += 2
+        for m in _CHOICE_RE.finditer(' '.join(args)):
+            if m.group(1) is not None:
+                choices = m.group(1).upper()
             else:
-                i += 1
+                prompt = m.group(2)
         
-        print(f"{prompt} ", end="")
+        text = f"{prompt} "
         while True:
             try:
-                response = input().upper()
+                response = _prompt(text)[:1].upper()
                 if response in choices:
                     return choices.index(response) + 1
                 else:
-                    print(f"Invalid choice. Please select from {list(choices)}: ", end="")
+                    text = f"Invalid choice. Please select from {list(choices)}: "
             except KeyboardInterrupt:
                 break
 
 # Batch Operations
 class IfCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("IF command requires batch file context.")
 
 class ForCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("FOR command requires batch file context.")
 
 class GotoCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("GOTO command requires batch file context.")
 
 class ShiftCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("SHIFT command requires batch file context.")
 
 class EndlocalCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("ENDLOCAL command processed.")
 
 class SetlocalCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("SETLOCAL command processed.")
 
 class RemCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         # REM is a comment in batch files - do nothing
         pass
 
 # Archive and Compression
 class ExpandCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("Microsoft (R) File Expansion Utility")
@@ -482,6 +633,7 @@ class ExpandCommand(BaseCommand):
             print(f"Cannot expand {source}")
 
 class MakecabCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("Microsoft (R) Cabinet Maker")
         print("Copyright (c) Microsoft Corporation. All rights reserved.")
@@ -490,165 +642,174 @@ class MakecabCommand(BaseCommand):
             print("MAKECAB [/V[n]] [/D var=value ...] [/L dir] source [destination]")
             print("MAKECAB [/V[n]] [/D var=value ...] /F directive_file [...]")
 
-class CompactCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['compact'] + args, check=False)
-        except:
-            print("Displays or alters the compression of files on NTFS partitions.")
-            if not args:
-                print()
-                print("COMPACT [/C | /U] [/S[:dir]] [/A] [/I] [/F] [/Q] [filename [...]]")
+_COMPACT_FALLBACK = b"Displays or alters the compression of files on NTFS partitions.\n"
+
+_COMPACT_USAGE = (
+    b"\n"
+    b"COMPACT [/C | /U] [/S[:dir]] [/A] [/I] [/F] [/Q] [filename [...]]\n"
+)
 
 # Security Commands
+_CACLS_NOTE = b"NOTE: Cacls is now deprecated, please use Icacls.\n"
+_CACLS_HELP = _CACLS_NOTE + b"\nDisplays or modifies access control lists (ACLs) of files\n"
+
 class CaclsCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        print("NOTE: Cacls is now deprecated, please use Icacls.")
         if not args:
-            print()
-            print("Displays or modifies access control lists (ACLs) of files")
-
-class IcaclsCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['icacls'] + args, check=False)
-        except:
-            if not args:
-                print("ICACLS name /save aclfile [/T] [/C] [/L] [/Q]")
-                print("       stores the DACLs for the files and folders that match the name")
-                print("       into aclfile for later use with /restore. Note that SACLs,")
-                print("       owner, or integrity labels are not saved.")
-
-class TakeownCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['takeown'] + args, check=False)
-        except:
-            if not args:
-                print("TAKEOWN [/S system [/U username [/P [password]]]]")
-                print("        /F filename [/A] [/R [/D prompt]]")
+            _write_bytes(_CACLS_HELP)
+        else:
+            _write_bytes(_CACLS_NOTE)
+
+_ICACLS_HELP = (
+    b"ICACLS name /save aclfile [/T] [/C] [/L] [/Q]\n"
+    b"       stores the DACLs for the files and folders that match the name\n"
+    b"       into aclfile for later use with /restore. Note that SACLs,\n"
+    b"       owner, or integrity labels are not saved.\n"
+)
+
+_TAKEOWN_HELP = (
+    b"TAKEOWN [/S system [/U username [/P [password]]]]\n"
+    b"        /F filename [/A] [/R [/D prompt]]\n"
+)
+
+_RUNAS_USAGE = (
+    b"RUNAS USAGE:\n"
+    b"\n"
+    b"RUNAS [ [/noprofile | /profile] [/env] [/savecred | /netonly] ]\n"
+    b"        /user:<UserName> program\n"
+)
 
 class RunasCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
-            print("RUNAS USAGE:")
-            print()
-            print("RUNAS [ [/noprofile | /profile] [/env] [/savecred | /netonly] ]")
-            print("        /user:<UserName> program")
+            _write_bytes(_RUNAS_USAGE)
             return
         
-        print("Enter the password for", args[args.index('/user:') + 1] if '/user:' in args else "user", ": ", end="")
-        password = input()
-        print("Attempting to start", args[-1], "as user", args[args.index('/user:') + 1] if '/user:' in args else "user", "...")
+        # Accept both "/user:name" and "/user: name" in a single pass
+        user = "user"
+        it = iter(args)
+        for arg in it:
+            if arg[:6].lower() == '/user:':
+                user = arg[6:] or next(it, user)
+                break
+        password = _prompt(f"Enter the password for {user} : ")
+        print("Attempting to start", args[-1], "as user", user, "...")
 
 # Advanced System Tools
 class WmicCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        try:
-            subprocess.run(['wmic'] + args, check=False)
-        except:
+        if _available('wmic'):
+            _run(['wmic', *args])
+        else:
             if not args:
                 print("wmic:root\\cli>")
             else:
                 print("WMI command-line utility not available.")
 
 class PowershellCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        try:
-            subprocess.run(['powershell'] + args, check=False)
-        except:
+        if _available('powershell'):
+            _run(['powershell', *args])
+        else:
             print("Windows PowerShell")
             print("Copyright (C) Microsoft Corporation. All rights reserved.")
 
 class CmdCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        try:
-            subprocess.run(['cmd'] + args, check=False)
-        except:
+        if _available('cmd'):
+            _run(['cmd', *args])
+        else:
             print("Microsoft Windows [Version 10.0.19041.1706]")
             print("(c) Microsoft Corporation. All rights reserved.")
 
+_DOSKEY_HELP = (
+    b"Edits command lines, recalls Windows commands, and creates macros.\n"
+    b"\n"
+    b"DOSKEY [/REINSTALL] [/LISTSIZE=size] [/MACROS[:exe]] [/HISTORY]\n"
+    b"       [/INSERT | /OVERSTRIKE] [/EXENAME=exe] [/MACROFILE=filename]\n"
+    b"       [macroname=[text]]\n"
+)
+
 class DoskeyCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
-            print("Edits command lines, recalls Windows commands, and creates macros.")
-            print()
-            print("DOSKEY [/REINSTALL] [/LISTSIZE=size] [/MACROS[:exe]] [/HISTORY]")
-            print("       [/INSERT | /OVERSTRIKE] [/EXENAME=exe] [/MACROFILE=filename]")
-            print("       [macroname=[text]]")
+            _write_bytes(_DOSKEY_HELP)
             return
         
-        if '/HISTORY' in args:
+        switches = {arg.upper() for arg in args}
+        if '/HISTORY' in switches:
             print("Command history:")
             # In a real implementation, this would show actual history
-        elif '/MACROS' in args:
+        elif '/MACROS' in switches:
             print("No macros defined.")
 
 # Scheduling Commands
 class AtCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("The AT command has been deprecated. Please use schtasks.exe instead")
         print("The AT command has been superseded by schtasks.exe.")
 
-class SchtasksCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['schtasks'] + args, check=False)
-        except:
-            if not args:
-                print("SCHTASKS /parameter [arguments]")
-                print()
-                print("Description:")
-                print("    Enables an administrator to create, delete, query, change, run and")
-                print("    end scheduled tasks on a local or remote system.")
+_SCHTASKS_HELP = (
+    b"SCHTASKS /parameter [arguments]\n"
+    b"\n"
+    b"Description:\n"
+    b"    Enables an administrator to create, delete, query, change, run and\n"
+    b"    end scheduled tasks on a local or remote system.\n"
+)
 
 # Hardware Commands
-class DriverqueryCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['driverquery'] + args, check=False)
-        except:
-            print("Module Name  Display Name           Driver Type   Link Date")
-            print("============ ====================== ============= ======================")
-            print("1394ohci     1394 OHCI Compliant... Kernel        11/20/2010 10:24:32 PM")
-
-class PnputilCommand(BaseCommand):
-    def execute(self, args):
-        try:
-            subprocess.run(['pnputil'] + args, check=False)
-        except:
-            if not args:
-                print("Microsoft PnP Utility")
-                print()
-                print("Usage:")
-                print("------")
-                print()
-                print("To add a driver package:")
-                print("  pnputil.exe -a <filename.inf>")
+_DRIVERQUERY_FALLBACK = (
+    b"Module Name  Display Name           Driver Type   Link Date\n"
+    b"============ ====================== ============= ======================\n"
+    b"1394ohci     1394 OHCI Compliant... Kernel        11/20/2010 10:24:32 PM\n"
+)
+
+_PNPUTIL_HELP = (
+    b"Microsoft PnP Utility\n"
+    b"\n"
+    b"Usage:\n"
+    b"------\n"
+    b"\n"
+    b"To add a driver package:\n"
+    b"  pnputil.exe -a <filename.inf>\n"
+)
 
 # Memory Commands
+_MEM_REPORT = (
+    b"Memory Type         Total       Used       Free\n"
+    b"----------------  --------   --------   --------\n"
+    b"Conventional        640K       64K        576K\n"
+    b"Upper               384K       128K       256K\n"
+    b"Reserved            384K       384K       0K\n"
+    b"Extended (XMS)      15360K     1024K      14336K\n"
+    b"----------------  --------   --------   --------\n"
+    b"Total memory        16768K     1600K      15168K\n"
+    b"\n"
+    b"Total under 1 MB    1024K      192K       832K\n"
+    b"\n"
+    b"Largest executable program size       576K (589,824 bytes)\n"
+    b"Largest free upper memory block       256K (262,144 bytes)\n"
+    b"MS-DOS is resident in the high memory area.\n"
+)
+
 class MemCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        print("Memory Type         Total       Used       Free")  
-        print("----------------  --------   --------   --------")
-        print("Conventional        640K       64K        576K")
-        print("Upper               384K       128K       256K")
-        print("Reserved            384K       384K       0K")
-        print("Extended (XMS)      15360K     1024K      14336K")
-        print("----------------  --------   --------   --------")
-        print("Total memory        16768K     1600K      15168K")
-        print()
-        print("Total under 1 MB    1024K      192K       832K")
-        print()
-        print("Largest executable program size       576K (589,824 bytes)")
-        print("Largest free upper memory block       256K (262,144 bytes)")
-        print("MS-DOS is resident in the high memory area.")
+        _write_bytes(_MEM_REPORT)
 
 class TaskmgrCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['taskmgr'] + args)
+                _detach_launch('taskmgr', args)
                 print("Task Manager launched.")
             else:
                 print("Task Manager is not available on this platform.")
@@ -656,52 +817,66 @@ class TaskmgrCommand(BaseCommand):
             print("Unable to launch Task Manager.")
 
 # File Association Commands
+_ASSOCIATIONS = (
+    ('.txt', 'txtfile'),
+    ('.bat', 'batfile'),
+    ('.cmd', 'cmdfile'),
+    ('.exe', 'exefile'),
+    ('.com', 'comfile'),
+    ('.doc', 'Word.Document.8'),
+    ('.docx', 'Word.Document.12'),
+    ('.pdf', 'AcroExch.Document'),
+)
+_FTYPES = (
+    ('txtfile', 'C:\\Windows\\System32\\NOTEPAD.EXE %1'),
+    ('batfile', '"%1" %*'),
+    ('cmdfile', '"%1" %*'),
+    ('exefile', '"%1" %*'),
+)
+
+@functools.lru_cache(maxsize=None)
+def _assoc_table():
+    """Format the ASSOC listing and per-extension lines on first use"""
+    query = {ext: f"{ext}={filetype}\n" for ext, filetype in _ASSOCIATIONS}
+    return ''.join(query.values()), query
+
+@functools.lru_cache(maxsize=None)
+def _ftype_listing():
+    """Format the FTYPE listing on first use"""
+    return ''.join(f"{ftype}={command}\n" for ftype, command in _FTYPES)
+
 class AssocCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             # Show all associations
-            associations = {
-                '.txt': 'txtfile',
-                '.bat': 'batfile', 
-                '.cmd': 'cmdfile',
-                '.exe': 'exefile',
-                '.com': 'comfile',
-                '.doc': 'Word.Document.8',
-                '.docx': 'Word.Document.12',
-                '.pdf': 'AcroExch.Document'
-            }
-            for ext, filetype in associations.items():
-                print(f"{ext}={filetype}")
+            sys.stdout.write(_assoc_table()[0])
         else:
             ext = args[0]
             if ext.startswith('.'):
-                # Query specific extension
-                print(f"{ext}=txtfile")
+                # Query specific extension; known ones are preformatted
+                line = _assoc_table()[1].get(ext.lower())
+                sys.stdout.write(line if line is not None else f"{ext}=txtfile\n")
             else:
                 print("File association not found.")
 
 class FtypeCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             # Show all file types
-            filetypes = {
-                'txtfile': 'C:\\Windows\\System32\\NOTEPAD.EXE %1',
-                'batfile': '"%1" %*',
-                'cmdfile': '"%1" %*',
-                'exefile': '"%1" %*'
-            }
-            for ftype, command in filetypes.items():
-                print(f"{ftype}={command}")
+            sys.stdout.write(_ftype_listing())
         else:
             ftype = args[0]
             print(f"{ftype}=C:\\Windows\\System32\\NOTEPAD.EXE %1")
 
 # Miscellaneous Applications
 class CalcCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['calc'] + args)
+                _detach_launch('calc', args)
                 print("Calculator launched.")
             else:
                 print("Calculator is not available on this platform.")
@@ -709,13 +884,11 @@ class CalcCommand(BaseCommand):
             print("Unable to launch Calculator.")
 
 class ExplorerCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                if args:
-                    subprocess.Popen(['explorer'] + args)
-                else:
-                    subprocess.Popen(['explorer', '.'])
+                _detach_launch('explorer', args or ['.'])
                 print("Windows Explorer launched.")
             else:
                 print("Windows Explorer is not available on this platform.")
@@ -723,10 +896,11 @@ class ExplorerCommand(BaseCommand):
             print("Unable to launch Windows Explorer.")
 
 class MspaintCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['mspaint'] + args)
+                _detach_launch('mspaint', args)
                 print("Paint launched.")
             else:
                 print("Paint is not available on this platform.")
@@ -734,10 +908,11 @@ class MspaintCommand(BaseCommand):
             print("Unable to launch Paint.")
 
 class ControlCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['control'] + args)
+                _detach_launch('control', args)
                 print("Control Panel launched.")
             else:
                 print("Control Panel is not available on this platform.")
@@ -745,10 +920,11 @@ class ControlCommand(BaseCommand):
             print("Unable to launch Control Panel.")
 
 class AppwizCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['appwiz.cpl'])
+                _detach_launch('appwiz.cpl', [])
                 print("Programs and Features launched.")
             else:
                 print("Programs and Features is not available on this platform.")
@@ -756,20 +932,124 @@ class AppwizCommand(BaseCommand):
             print("Unable to launch Programs and Features.")
 
 # Additional File Operations
+_ROBOCOPY_TIME_FORMAT = "%A %B %d %Y %H:%M:%S"
+
+_ROBOCOPY_HEADER = (
+    b"-------------------------------------------------------------------------------\n"
+    b"   ROBOCOPY     ::     Robust File Copy for Windows\n"
+    b"-------------------------------------------------------------------------------\n"
+    b"\n"
+)
+
+_ROBOCOPY_USAGE = (
+    b"\n"
+    b"                           Usage :: ROBOCOPY source destination [file [file]...] [options]\n"
+    b"\n"
+    b"             source :: Source Directory (drive:\\path or \\\\server\\share\\path).\n"
+    b"        destination :: Destination Dir  (drive:\\path or \\\\server\\share\\path).\n"
+    b"               file :: File(s) to copy  (names/wildcards: default is \"*.*\").\n"
+)
+
+def _scan_files(source):
+    """Yield a DirEntry for every file below source; scandir hands back
+    the type and, on Windows, the size without a stat per file"""
+    pending = [source]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for entry in it:
+                if entry.is_dir():
+                    # Like os.walk, linked directories are not descended into
+                    if not entry.is_symlink():
+                        pending.append(entry.path)
+                else:
+                    yield entry
+
+# Errors meaning copy_file_range cannot serve this pair of files
+_NO_COPY_RANGE = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+
+def _reflink(in_fd, out_fd):
+    """Clone the source's blocks copy-on-write with the Linux FICLONE ioctl;
+    False where the filesystem cannot share extents"""
+    import fcntl
+    try:
+        fcntl.ioctl(out_fd, 0x40049409, in_fd)  # FICLONE
+    except OSError:
+        return False
+    return True
+
+def _fast_copy(src_file, dest_file):
+    """Copy a file with its metadata, keeping the data inside the kernel
+    with copy_file_range (a reflink on XFS and Btrfs) where it can"""
+    if os.path.isdir(dest_file):
+        dest_file = os.path.join(dest_file, os.path.basename(src_file))
+    if not hasattr(os, 'copy_file_range'):
+        return shutil.copy2(src_file, dest_file)
+    
+    # Opening the destination truncates it, so refuse to copy a file onto
+    # itself the way shutil.copy2 does
+    try:
+        same = os.path.samefile(src_file, dest_file)
+    except OSError:
+        same = False
+    if same:
+        raise shutil.SameFileError(f"{src_file!r} and {dest_file!r} are the same file")
+    
+    try:
+        with open(src_file, 'rb') as fsrc, open(dest_file, 'wb') as fdst:
+            in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+            # A clone is constant time whatever the size; otherwise copy in-kernel
+            if not _reflink(in_fd, out_fd):
+                while os.copy_file_range(in_fd, out_fd, 1 << 30):
+                    pass
+    except OSError as e:
+        if e.errno not in _NO_COPY_RANGE:
+            raise
+        return shutil.copy2(src_file, dest_file)
+    shutil.copystat(src_file, dest_file)
+    return dest_file
+
+def _copy_counted(src_file, dest_file, size):
+    """Copy one file with its metadata and return its size"""
+    _fast_copy(src_file, dest_file)
+    return size
+
+# Files below this size are dominated by open/close latency rather than bandwidth
+_SMALL_FILE_LIMIT = 256 * 1024
+
+def _copy_files(jobs):
+    """Copy (source, dest, size) jobs on thread pools; returns the byte total"""
+    # Copying is I/O bound, so threads overlap the waits despite the GIL.
+    # Small files get many workers to hide per-file latency; large files get
+    # a few so they stream without fighting each other for the disk.
+    small = [job for job in jobs if job[2] < _SMALL_FILE_LIMIT]
+    large = [job for job in jobs if job[2] >= _SMALL_FILE_LIMIT]
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    total_bytes = 0
+    with ThreadPoolExecutor(max_workers=workers) as small_pool, \
+            ThreadPoolExecutor(max_workers=4) as large_pool:
+        futures = [large_pool.submit(_copy_counted, *job) for job in large]
+        futures += [small_pool.submit(_copy_counted, *job) for job in small]
+        try:
+            for future in as_completed(futures):
+                total_bytes += future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    return total_bytes
+
 class RobocopyCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
+        # The real tool copies multithreaded in native code and prints its own report
+        if _available('robocopy'):
+            return _run(['robocopy', *args]).returncode
+        
         if len(args) < 2:
-            print("-------------------------------------------------------------------------------")
-            print("   ROBOCOPY     ::     Robust File Copy for Windows")
-            print("-------------------------------------------------------------------------------")
-            print()
-            print("  Started : ", datetime.datetime.now().strftime("%A %B %d %Y %H:%M:%S"))
-            print()
-            print("                           Usage :: ROBOCOPY source destination [file [file]...] [options]")
-            print()
-            print("             source :: Source Directory (drive:\\path or \\\\server\\share\\path).")
-            print("        destination :: Destination Dir  (drive:\\path or \\\\server\\share\\path).")
-            print("               file :: File(s) to copy  (names/wildcards: default is \"*.*\").")
+            # Only the timestamp is formatted per call
+            started = _format_now(_ROBOCOPY_TIME_FORMAT)
+            _write_bytes(_ROBOCOPY_HEADER + b"  Started :  " + started.encode() + b"\n"
+                         + _ROBOCOPY_USAGE)
             return
         
         source = args[0]
@@ -780,28 +1060,30 @@ class RobocopyCommand(BaseCommand):
                 if not os.path.exists(dest):
                     os.makedirs(dest)
                 
-                files_copied = 0
-                for root, dirs, files in os.walk(source):
-                    for file in files:
-                        src_file = os.path.join(root, file)
-                        rel_path = os.path.relpath(src_file, source)
-                        dest_file = os.path.join(dest, rel_path)
-                        
-                        dest_dir = os.path.dirname(dest_file)
-                        if not os.path.exists(dest_dir):
-                            os.makedirs(dest_dir)
-                        
-                        shutil.copy2(src_file, dest_file)
-                        files_copied += 1
+                jobs = []
+                dest_dirs = set()
+                for entry in _scan_files(source):
+                    rel_path = os.path.relpath(entry.path, source)
+                    dest_file = os.path.join(dest, rel_path)
+                    dest_dirs.add(os.path.dirname(dest_file))
+                    jobs.append((entry.path, dest_file, entry.stat().st_size))
+                
+                # Create the directory structure first so workers never race on it
+                for dest_dir in sorted(dest_dirs):
+                    os.makedirs(dest_dir, exist_ok=True)
+                
+                # Sizes are tallied while copying rather than re-walking the tree
+                total_bytes = _copy_files(jobs)
+                files_copied = len(jobs)
                 
                 print(f"               Total    Copied   Skipped  Mismatch    FAILED    Extras")
                 print(f"    Dirs :         1         1         0         0         0         0")
                 print(f"   Files :    {files_copied:6}    {files_copied:6}         0         0         0         0")
-                print(f"   Bytes :   {sum(os.path.getsize(os.path.join(root, file)) for root, dirs, files in os.walk(source) for file in files):>8}   {sum(os.path.getsize(os.path.join(root, file)) for root, dirs, files in os.walk(source) for file in files):>8}         0         0         0         0")
+                print(f"   Bytes :   {total_bytes:>8}   {total_bytes:>8}         0         0         0         0")
                 print()
                 print("   Speed :              999999 Bytes/sec.")
                 print("   Speed :              57.220 MegaBytes/min.")
-                print("   Ended : ", datetime.datetime.now().strftime("%A %B %d %Y %H:%M:%S"))
+                print("   Ended : ", _format_now(_ROBOCOPY_TIME_FORMAT))
             else:
                 print("ERROR 2 (0x00000002) Accessing Source Directory", source)
                 print("The system cannot find the file specified.")
@@ -809,33 +1091,53 @@ class RobocopyCommand(BaseCommand):
             print(f"ERROR: {e}")
 
 class EditCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         print("MS-DOS Editor is not available in this version of Windows.")
         print("Use NOTEPAD instead.")
 
 class NotepadCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['notepad'] + args)
+                _detach_launch('notepad', args)
                 print("Notepad launched.")
             else:
                 print("Notepad is not available on this platform.")
-        except:
+        except OSError:
             print("Unable to launch Notepad.")
 
 class WordpadCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.Popen(['wordpad'] + args)
+                _detach_launch('wordpad', args)
                 print("WordPad launched.")
             else:
                 print("WordPad is not available on this platform.")
-        except:
+        except OSError:
             print("Unable to launch WordPad.")
 
+def _same_bytes(file1, file2, chunk=1 << 20):
+    """Byte-compare two files through mmap; each slice comparison is a
+    single memcmp, and only one chunk per file is copied out at a time"""
+    with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
+        size = os.fstat(f1.fileno()).st_size
+        if size != os.fstat(f2.fileno()).st_size:
+            return False
+        if not size:
+            return True
+        with mmap.mmap(f1.fileno(), 0, access=mmap.ACCESS_READ) as m1, \
+                mmap.mmap(f2.fileno(), 0, access=mmap.ACCESS_READ) as m2:
+            for offset in range(0, size, chunk):
+                if m1[offset:offset + chunk] != m2[offset:offset + chunk]:
+                    return False
+    return True
+
 class CompCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("Compares the contents of two files or sets of files.")
@@ -847,20 +1149,38 @@ class CompCommand(BaseCommand):
         file2 = args[1]
         
         try:
-            with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
-                content1 = f1.read()
-                content2 = f2.read()
-                
-                if content1 == content2:
-                    print("Files compare OK")
-                else:
-                    print("Files are different sizes")
+            # Sizes settle most mismatches without reading either file
+            if os.path.getsize(file1) != os.path.getsize(file2):
+                print("Files are different sizes")
+            elif _same_bytes(file1, file2):
+                print("Files compare OK")
+            else:
+                print("Files are different")
         except FileNotFoundError as e:
             print(f"File not found: {e.filename}")
         except Exception as e:
             print(f"Error comparing files: {e}")
 
+def _text_lines(data):
+    """Bytes with CRLF and CR line ends folded to LF, as text mode reads them"""
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data
+
+def _head_lines(data, count=5):
+    """Decode only the first count lines; find() scans for each newline in C"""
+    lines = []
+    start = 0
+    while start < len(data) and len(lines) < count:
+        end = data.find(b'\n', start)
+        if end < 0:
+            end = len(data)
+        lines.append(data[start:end].decode('utf-8', 'ignore'))
+        start = end + 1
+    return lines
+
 class FcCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("Compares two files or sets of files and displays the differences between them")
@@ -874,29 +1194,36 @@ class FcCommand(BaseCommand):
         file2 = args[1]
         
         try:
-            with open(file1, 'r', encoding='utf-8', errors='ignore') as f1:
-                with open(file2, 'r', encoding='utf-8', errors='ignore') as f2:
-                    lines1 = f1.readlines()
-                    lines2 = f2.readlines()
-                    
-                    print(f"Comparing files {file1} and {file2}")
-                    
-                    if lines1 == lines2:
-                        print("FC: no differences encountered")
-                    else:
-                        print("***** " + file1)
-                        for i, line in enumerate(lines1[:5], 1):
-                            print(f"{i:5}: {line.rstrip()}")
-                        print("***** " + file2)
-                        for i, line in enumerate(lines2[:5], 1):
-                            print(f"{i:5}: {line.rstrip()}")
-                            
+            # Byte-identical files need no decoding or line splitting
+            if _same_bytes(file1, file2):
+                print(f"Comparing files {file1} and {file2}")
+                print("FC: no differences encountered")
+                return
+            
+            # Compare as bytes; only the lines shown are ever decoded
+            with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
+                data1 = _text_lines(f1.read())
+                data2 = _text_lines(f2.read())
+            
+            print(f"Comparing files {file1} and {file2}")
+            
+            if data1 == data2:
+                print("FC: no differences encountered")
+            else:
+                print("***** " + file1)
+                for i, line in enumerate(_head_lines(data1), 1):
+                    print(f"{i:5}: {line.rstrip()}")
+                print("***** " + file2)
+                for i, line in enumerate(_head_lines(data2), 1):
+                    print(f"{i:5}: {line.rstrip()}")
+            
         except FileNotFoundError as e:
             print(f"File not found: {e.filename}")
         except Exception as e:
             print(f"Error comparing files: {e}")
 
 class ReplaceCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if len(args) < 2:
             print("Replaces files.")
@@ -910,7 +1237,7 @@ class ReplaceCommand(BaseCommand):
         
         try:
             if os.path.isfile(source):
-                shutil.copy2(source, dest)
+                _fast_copy(source, dest)
                 print("1 file(s) replaced")
             else:
                 print("Source file not found")
@@ -918,6 +1245,7 @@ class ReplaceCommand(BaseCommand):
             print(f"Error replacing file: {e}")
 
 class SubstCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Associates a path with a drive letter.")
@@ -940,18 +1268,59 @@ class SubstCommand(BaseCommand):
         else:
             print("Invalid number of parameters")
 
+@functools.lru_cache(maxsize=None)
+def _clipboard_api():
+    """Load and type the Win32 clipboard calls once, on first use"""
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+    # Handles and pointers are 64-bit; the default int restype would truncate them
+    user32.OpenClipboard.argtypes = [wintypes.HWND]
+    user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    user32.SetClipboardData.restype = wintypes.HANDLE
+    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+    return ctypes, user32, kernel32
+
+def _set_clipboard(text):
+    """Put text on the Windows clipboard without spawning clip.exe"""
+    ctypes, user32, kernel32 = _clipboard_api()
+    data = text.encode('utf-16-le') + b'\0\0'
+    if not user32.OpenClipboard(None):
+        raise ctypes.WinError()
+    try:
+        user32.EmptyClipboard()
+        handle = kernel32.GlobalAlloc(0x0042, len(data))  # GHND
+        if not handle:
+            raise ctypes.WinError()
+        ctypes.memmove(kernel32.GlobalLock(handle), data, len(data))
+        kernel32.GlobalUnlock(handle)
+        # The clipboard owns the memory once SetClipboardData succeeds
+        if not user32.SetClipboardData(13, handle):  # CF_UNICODETEXT
+            kernel32.GlobalFree(handle)
+            raise ctypes.WinError()
+    finally:
+        user32.CloseClipboard()
+
 class ClipCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         try:
             if os.name == 'nt':
-                subprocess.run(['clip'], input=sys.stdin.read(), text=True, check=True)
+                _set_clipboard(sys.stdin.read())
             else:
                 print("CLIP command is not available on this platform.")
-        except:
+        except OSError:
             print("Redirects output of command line tools to the Windows clipboard.")
             print("This text output can then be pasted into other programs.")
 
 class PrintCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Prints a text file.")
@@ -965,11 +1334,22 @@ class PrintCommand(BaseCommand):
                     print(f"Printing {filename}")
                     # In a real implementation, this would send to printer
                     print(f"{filename} is being printed")
-                except:
+                except OSError:
                     print(f"Unable to print {filename}")
 
 # Disk Utilities
+def _fsutil_fsinfo(args):
+    """FSUTIL FSINFO; only the DRIVES listing is emulated"""
+    if args and args[0].lower() == 'drives':
+        print("Drives: A:\\ C:\\ D:\\")
+
+# Built-in stand-ins for FSUTIL subcommands, keyed by lowercase name
+_FSUTIL_HANDLERS = {
+    'fsinfo': _fsutil_fsinfo,
+}
+
 class FsutilCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("---- Commands Supported ----")
@@ -992,17 +1372,18 @@ class FsutilCommand(BaseCommand):
             print("volume          Volume management")
             return
         
-        try:
-            subprocess.run(['fsutil'] + args, check=False)
-        except:
+        if _available('fsutil'):
+            _run(['fsutil', *args])
+        else:
             subcommand = args[0].lower()
-            if subcommand == 'fsinfo':
-                if len(args) > 1 and args[1].lower() == 'drives':
-                    print("Drives: A:\\ C:\\ D:\\")
+            handler = _FSUTIL_HANDLERS.get(subcommand)
+            if handler is not None:
+                handler(args[1:])
             else:
                 print(f"The {subcommand} command is not available in this implementation.")
 
 class DefragCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
         if not args:
             print("Disk Defragmenter")
@@ -1016,19 +1397,27 @@ class DefragCommand(BaseCommand):
         print(f"Defragmenting volume {volume}...")
         print("This may take several minutes to complete.")
         
-        # Simulate defragmentation
-        for i in range(5):
-            print(f"Pass {i+1}: {(i+1)*20}% complete...")
-            time.sleep(0.5)
+        # Simulate defragmentation; only a console gets the animated progress,
+        # redirected output and scripts get the pass lines without waiting
+        if sys.stdout.isatty():
+            for i in range(5):
+                sys.stdout.write(f"\rPass {i+1}: {(i+1)*20}% complete...")
+                sys.stdout.flush()
+                time.sleep(0.05)
+            print()
+        else:
+            for i in range(5):
+                print(f"Pass {i+1}: {(i+1)*20}% complete...")
         
         print(f"Defragmentation of volume {volume} is complete.")
 
 # Additional System Commands
 class CipherCommand(BaseCommand):
+    __slots__ = ()
     def execute(self, args):
-        try:
-            subprocess.run(['cipher'] + args, check=False)
-        except:
+        if _available('cipher'):
+            _run(['cipher', *args])
+        else:
             if not args:
                 print("Displays or alters the encryption of directories [files] on NTFS partitions.")
                 print()
@@ -1041,4 +1430,18 @@ class CipherCommand(BaseCommand):
                 print("                   so that files added afterward will not be encrypted.")
                 print("         /C        Displays information on the encrypted file.")
                 print("         /S        Performs the specified operation on directories in the given")
-                print("                   directory and all subdirectories.")
\ No newline at end of file
+                print("                   directory and all subdirectories.")
+
+# Tools that only pass through to an external executable
+PASSTHROUGH_COMMANDS = {
+    'arp': PassthroughCommand('arp', _ARP_FALLBACK),
+    'netstat': PassthroughCommand('netstat', _NETSTAT_FALLBACK),
+    'route': PassthroughCommand('route', _ROUTE_FALLBACK),
+    'powercfg': PassthroughCommand('powercfg', usage=_POWERCFG_HELP),
+    'compact': PassthroughCommand('compact', _COMPACT_FALLBACK, _COMPACT_USAGE),
+    'icacls': PassthroughCommand('icacls', usage=_ICACLS_HELP),
+    'takeown': PassthroughCommand('takeown', usage=_TAKEOWN_HELP),
+    'schtasks': PassthroughCommand('schtasks', usage=_SCHTASKS_HELP),
+    'driverquery': PassthroughCommand('driverquery', _DRIVERQUERY_FALLBACK),
+    'pnputil': PassthroughCommand('pnputil', usage=_PNPUTIL_HELP),
+}
\ No newline at end of file
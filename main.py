@@ -6,11 +6,35 @@ Windows Command Prompt written in Python
 
 import sys
 import os
+import atexit
+import functools
+from types import MappingProxyType
+import commands
 from command_processor import CommandProcessor
 from utils import Utils
 
+@functools.lru_cache(maxsize=None)
+def _build_builtin_commands():
+    """Build the basic processor's command table once per process"""
+    # Import specific commands instead of using import *
+    from commands import (CDCommand, DirCommand, ClsCommand, EchoCommand, 
+                        ExitCommand, HelpCommand, VerCommand, DateCommand, 
+                        TimeCommand, CopyCommand, DelCommand, MkdirCommand, 
+                        RmdirCommand, TypeCommand)
+    
+    # The table never changes, so expose it read-only
+    return MappingProxyType({
+        'cd': CDCommand(), 'dir': DirCommand(), 'cls': ClsCommand(),
+        'echo': EchoCommand(), 'exit': ExitCommand(), 'help': HelpCommand(),
+        'ver': VerCommand(), 'date': DateCommand(), 'time': TimeCommand(),
+        'copy': CopyCommand(), 'del': DelCommand(), 'md': MkdirCommand(),
+        'rd': RmdirCommand(), 'type': TypeCommand()
+    })
+
 class CommandPrompt:
     def __init__(self):
+        self._prompt = None
+        self._prompt_version = None
         try:
             self.processor = CommandProcessor()
             self.utils = Utils()
@@ -24,41 +48,61 @@ class CommandPrompt:
         
     def _create_basic_processor(self):
         """Create a basic command processor as fallback"""
-        # Import specific commands instead of using import *
-        from commands import (CDCommand, DirCommand, ClsCommand, EchoCommand, 
-                            ExitCommand, HelpCommand, VerCommand, DateCommand, 
-                            TimeCommand, CopyCommand, DelCommand, MkdirCommand, 
-                            RmdirCommand, TypeCommand)
-        
         class BasicCommandProcessor:
             def __init__(self):
-                self.builtin_commands = {
-                    'cd': CDCommand(), 'dir': DirCommand(), 'cls': ClsCommand(),
-                    'echo': EchoCommand(), 'exit': ExitCommand(), 'help': HelpCommand(),
-                    'ver': VerCommand(), 'date': DateCommand(), 'time': TimeCommand(),
-                    'copy': CopyCommand(), 'del': DelCommand(), 'md': MkdirCommand(),
-                    'rd': RmdirCommand(), 'type': TypeCommand()
-                }
-                self.env_vars = dict(os.environ)
+                self.builtin_commands = _build_builtin_commands()
+                self.env_vars = os.environ
             
             def process_command(self, command_line):
-                parts = command_line.split()
-                if not parts:
+                # Split off the command name only; the rest is split once
+                head, _, rest = command_line.strip().partition(' ')
+                if not head:
                     return
                 
-                command = parts[0].lower()
-                args = parts[1:] if len(parts) > 1 else []
-                
-                if command in self.builtin_commands:
-                    try:
-                        return self.builtin_commands[command].execute(args)
-                    except Exception as e:
-                        print(f"Command failed: {e}")
-                else:
+                command = head.lower()
+                handler = self.builtin_commands.get(command)
+                if handler is None:
                     print(f"'{command}' is not recognized as an internal or external command.")
+                    return
+                
+                try:
+                    return handler.execute(rest.split())
+                except Exception as e:
+                    print(f"Command failed: {e}")
         
         return BasicCommandProcessor()
         
+    def _setup_basic_readline(self):
+        """Give plain input() line editing, tab completion and history when
+        DOSKEY support is unavailable"""
+        try:
+            import readline
+        except ImportError:
+            return
+        
+        names = sorted(self.processor.builtin_commands)
+        
+        def complete(text, state):
+            prefix = text.lower()
+            matches = [name for name in names if name.startswith(prefix)]
+            return matches[state] if state < len(matches) else None
+        
+        readline.set_completer(complete)
+        readline.parse_and_bind("tab: complete")
+        
+        history_file = os.path.join(os.path.expanduser('~'), '.cmd_history')
+        try:
+            readline.read_history_file(history_file)
+        except OSError:
+            pass
+        
+        def save_history():
+            try:
+                readline.write_history_file(history_file)
+            except OSError:
+                pass
+        atexit.register(save_history)
+        
     def display_banner(self):
         """Display the initial banner like real CMD"""
         print("Microsoft Windows [Version 10.0.26100.4061]")
@@ -66,9 +110,12 @@ class CommandPrompt:
         print()
         
     def get_prompt(self):
-        """Generate the command prompt string"""
-        current_dir = os.getcwd()
-        return f"{current_dir}>"
+        """Generate the command prompt string; rebuilt only after CD"""
+        version = commands._cwd_version
+        if version != self._prompt_version:
+            self._prompt = f"{os.getcwd()}>"
+            self._prompt_version = version
+        return self._prompt
         
     def run(self):
         """Main command loop with enhanced input handling"""
@@ -78,6 +125,8 @@ class CommandPrompt:
         editor = None
         if hasattr(self.processor, 'doskey_components') and self.processor.doskey_components:
             editor = self.processor.doskey_components.get('editor')
+        if not editor:
+            self._setup_basic_readline()
         
         while self.running:
             try:
@@ -4,12 +4,75 @@ Handles command piping (|) and advanced redirection
 """
 
 import os
+import re
 import sys
 import subprocess
 import tempfile
+import threading
 from io import StringIO
 from contextlib import redirect_stdout, redirect_stderr
 
+# Pipe and redirection operators, longest first so that 2>&1, 2> and >>
+# are picked up whole instead of as a bare >. As in cmd, the handle number
+# must start a word: in "echo abc2>file" the 2 is text and > redirects stdout.
+_OP_RE = re.compile(r'(?<!\S)2>&1|(?<!\S)2>|>>|>|<|\|')
+_STDERR_RE = re.compile(r'(?<!\S)2>(?!&1)')
+_COMBINED_RE = re.compile(r'(?<!\S)2>&1')
+
+# Deletes every operator character; an unchanged length means none present
+_SPECIAL = str.maketrans('', '', '|<>')
+
+def _find_operators(command_line):
+    """The set of pipe and redirection operators in a line, in one scan"""
+    # Most lines have no operators at all; skip the regex for them
+    if len(command_line.translate(_SPECIAL)) == len(command_line):
+        return set()
+    return set(_OP_RE.findall(command_line))
+
+class _ListSink:
+    """Write-only text stream that collects chunks in a list and joins them
+    once at the end, instead of growing a StringIO buffer"""
+    __slots__ = ('buf',)
+    
+    def __init__(self):
+        self.buf = []
+    
+    def write(self, text):
+        self.buf.append(text)
+        return len(text)
+    
+    def writelines(self, lines):
+        self.buf.extend(lines)
+    
+    def flush(self):
+        pass
+    
+    def isatty(self):
+        return False
+    
+    def getvalue(self):
+        return ''.join(self.buf)
+
+# Per-thread free list of sinks, so capturing commands reuses them
+_sink_pool = threading.local()
+_SINK_POOL_SIZE = 8
+
+def _acquire_sink():
+    """Take an empty sink from this thread's free list, or make one"""
+    pool = getattr(_sink_pool, 'sinks', None)
+    if pool:
+        return pool.pop()
+    return _ListSink()
+
+def _release_sink(sink):
+    """Empty a sink and return it to this thread's free list"""
+    sink.buf.clear()
+    pool = getattr(_sink_pool, 'sinks', None)
+    if pool is None:
+        pool = _sink_pool.sinks = []
+    if len(pool) < _SINK_POOL_SIZE:
+        pool.append(sink)
+
 class PipelineProcessor:
     """Processes command pipelines and redirection"""
     
@@ -46,13 +109,14 @@ class PipelineProcessor:
     def capture_command_output(self, command):
         """Capture the output of a command"""
         old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
+        sys.stdout = captured_output = _acquire_sink()
         
         try:
             self.command_processor.process_command(command)
             output = captured_output.getvalue()
         finally:
             sys.stdout = old_stdout
+            _release_sink(captured_output)
         
         return output
     
@@ -61,7 +125,7 @@ class PipelineProcessor:
         old_stdout = sys.stdout
         old_stdin = sys.stdin
         
-        sys.stdout = captured_output = StringIO()
+        sys.stdout = captured_output = _acquire_sink()
         sys.stdin = StringIO(input_text)
         
         try:
@@ -70,6 +134,7 @@ class PipelineProcessor:
         finally:
             sys.stdout = old_stdout
             sys.stdin = old_stdin
+            _release_sink(captured_output)
         
         return output
     
@@ -89,75 +154,55 @@ class RedirectionProcessor:
     def __init__(self, command_processor):
         self.command_processor = command_processor
     
-    def process_redirection(self, command_line):
+    def process_redirection(self, command_line, operators=None):
         """Process command with redirection"""
-        # Handle different types of redirection
-        if '>>' in command_line:
+        if operators is None:
+            operators = _find_operators(command_line)
+        
+        # Handle different types of redirection; the stderr forms come
+        # first so a trailing 2>&1 or 2> is peeled off before > and >> split
+        # the line, which would otherwise end up in the file name
+        if '2>&1' in operators:
+            return self.handle_combined_redirect(command_line)
+        elif '2>' in operators:
+            return self.handle_error_redirect(command_line)
+        elif '>>' in operators:
             return self.handle_append_redirect(command_line)
-        elif '>' in command_line:
+        elif '>' in operators:
             return self.handle_output_redirect(command_line)
-        elif '<' in command_line:
+        elif '<' in operators:
             return self.handle_input_redirect(command_line)
-        elif '2>' in command_line:
-            return self.handle_error_redirect(command_line)
-        elif '2>&1' in command_line:
-            return self.handle_combined_redirect(command_line)
         else:
             return self.command_processor.process_command(command_line)
     
     def handle_output_redirect(self, command_line):
         """Handle output redirection (>)"""
-        parts = command_line.split('>', 1)
-        if len(parts) != 2:
-            return self.command_processor.process_command(command_line)
-        
-        command = parts[0].strip()
-        output_file = parts[1].strip()
-        
-        # Capture command output
-        old_stdout = sys.stdout
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
-        try:
-            self.command_processor.process_command(command)
-            output = captured_output.getvalue()
-            
-            # Write to file
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(output)
-                
-        except Exception as e:
-            print(f"Redirection failed: {e}")
-        finally:
-            sys.stdout = old_stdout
+        return self._redirect_to_file(command_line, '>', 'w')
     
     def handle_append_redirect(self, command_line):
         """Handle append redirection (>>)"""
-        parts = command_line.split('>>', 1)
+        return self._redirect_to_file(command_line, '>>', 'a')
+    
+    def _redirect_to_file(self, command_line, operator, mode):
+        """Run a command with stdout pointed straight at a file, so output is
+        written as it is produced instead of being buffered in memory"""
+        parts = command_line.split(operator, 1)
         if len(parts) != 2:
             return self.command_processor.process_command(command_line)
         
         command = parts[0].strip()
         output_file = parts[1].strip()
         
-        # Capture command output
         old_stdout = sys.stdout
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
         try:
-            self.command_processor.process_command(command)
-            output = captured_output.getvalue()
-            
-            # Append to file
-            with open(output_file, 'a', encoding='utf-8') as f:
-                f.write(output)
-                
+            with open(output_file, mode, encoding='utf-8', buffering=65536) as f:
+                sys.stdout = f
+                try:
+                    self.command_processor.process_command(command)
+                finally:
+                    sys.stdout = old_stdout
         except Exception as e:
             print(f"Redirection failed: {e}")
-        finally:
-            sys.stdout = old_stdout
     
     def handle_input_redirect(self, command_line):
         """Handle input redirection (<)"""
@@ -169,18 +214,15 @@ class RedirectionProcessor:
         input_file = parts[1].strip()
         
         try:
-            # Read input file
-            with open(input_file, 'r', encoding='utf-8') as f:
-                input_content = f.read()
-            
-            # Provide input to command
+            # The command reads the file itself, so it is streamed rather
+            # than loaded into memory first
             old_stdin = sys.stdin
-            sys.stdin = StringIO(input_content)
-            
-            try:
-                self.command_processor.process_command(command)
-            finally:
-                sys.stdin = old_stdin
+            with open(input_file, 'r', encoding='utf-8', buffering=65536) as f:
+                sys.stdin = f
+                try:
+                    self.command_processor.process_command(command)
+                finally:
+                    sys.stdin = old_stdin
                 
         except FileNotFoundError:
             print(f"The system cannot find the file {input_file}.")
@@ -189,7 +231,7 @@ class RedirectionProcessor:
     
     def handle_error_redirect(self, command_line):
         """Handle error redirection (2>)"""
-        parts = command_line.split('2>', 1)
+        parts = _STDERR_RE.split(command_line, 1)
         if len(parts) != 2:
             return self.command_processor.process_command(command_line)
         
@@ -198,7 +240,7 @@ class RedirectionProcessor:
         
         # Capture command stderr
         old_stderr = sys.stderr
-        captured_error = StringIO()
+        captured_error = _acquire_sink()
         sys.stderr = captured_error
         
         try:
@@ -214,10 +256,11 @@ class RedirectionProcessor:
             print(f"Error redirection failed: {e}")
         finally:
             sys.stderr = old_stderr
+            _release_sink(captured_error)
     
     def handle_combined_redirect(self, command_line):
         """Handle combined stdout/stderr redirection (2>&1)"""
-        parts = command_line.split('2>&1', 1)
+        parts = _COMBINED_RE.split(command_line, 1)
         if len(parts) != 2:
             return self.command_processor.process_command(command_line)
         
@@ -227,18 +270,19 @@ class RedirectionProcessor:
         old_stdout = sys.stdout
         old_stderr = sys.stderr
         
-        captured_output = StringIO()
+        captured_output = _acquire_sink()
         sys.stdout = captured_output
         sys.stderr = captured_output
         
         try:
             self.command_processor.process_command(command)
             combined_output = captured_output.getvalue()
-            print(combined_output, end='')
-            
         finally:
             sys.stdout = old_stdout
             sys.stderr = old_stderr
+            _release_sink(captured_output)
+        
+        print(combined_output, end='')
 
 class AdvancedCommandProcessor:
     """Enhanced command processor with full pipeline and redirection support"""
@@ -250,13 +294,14 @@ class AdvancedCommandProcessor:
     
     def process_command(self, command_line):
         """Process command with full pipeline and redirection support"""
-        # Check for pipes first
-        if '|' in command_line:
+        # One scan finds every operator; pipes take precedence
+        operators = _find_operators(command_line)
+        if '|' in operators:
             return self.pipeline_processor.process_pipeline(command_line)
         
         # Check for redirection
-        if any(redirect in command_line for redirect in ['>', '<', '2>', '2>&1']):
-            return self.redirection_processor.process_redirection(command_line)
+        if operators:
+            return self.redirection_processor.process_redirection(command_line, operators)
         
         # Regular command processing
         return self.base_processor.process_command(command_line)
@@ -287,52 +332,55 @@ class FilterCommands:
         lines = input_text.strip().split('\n')
         sorted_lines = sorted(lines, reverse=reverse)
         
-        for line in sorted_lines:
-            print(line)
+        # One join and one write instead of a print per line
+        sys.stdout.write('\n'.join(sorted_lines) + '\n')
     
     @staticmethod
     def find_filter(input_text, search_string, case_sensitive=True):
         """Implement FIND command functionality"""
         lines = input_text.split('\n')
         
-        for line_num, line in enumerate(lines, 1):
-            if case_sensitive:
-                if search_string in line:
-                    print(f"---------- STDIN: {line_num}")
-                    print(line)
-            else:
-                if search_string.lower() in line.lower():
-                    print(f"---------- STDIN: {line_num}")
-                    print(line)
+        # Case folding is done once for the needle and once for the whole
+        # text; lowering never adds or removes newlines, so the folded
+        # lines pair up with the originals
+        if case_sensitive:
+            probes = lines
+        else:
+            search_string = search_string.lower()
+            probes = input_text.lower().split('\n')
+        
+        # Collect the matches and write them in one call
+        out = [f"---------- STDIN: {line_num}\n{line}\n"
+               for line_num, (line, probe) in enumerate(zip(lines, probes), 1)
+               if search_string in probe]
+        sys.stdout.write(''.join(out))
     
     @staticmethod
     def findstr_filter(input_text, pattern, options=None):
         """Implement FINDSTR command functionality"""
-        import re
-        
-        lines = input_text.split('\n')
+        # Options are settled once, not re-tested for every line
+        options = set(options or ())
         flags = 0
-        
-        if options:
-            if '/I' in options:  # Case insensitive
-                flags |= re.IGNORECASE
-            if '/R' in options:  # Regular expression
-                pass  # Default behavior
-            if '/L' in options:  # Literal string
-                pattern = re.escape(pattern)
+        if '/I' in options:  # Case insensitive
+            flags |= re.IGNORECASE
+        # /R (regular expression) is the default behavior
+        if '/L' in options:  # Literal string
+            pattern = re.escape(pattern)
         
         try:
-            regex = re.compile(pattern, flags)
-            
-            for line_num, line in enumerate(lines, 1):
-                if regex.search(line):
-                    if '/N' in (options or []):
-                        print(f"{line_num}:{line}")
-                    else:
-                        print(line)
-                        
+            search = re.compile(pattern, flags).search
         except re.error as e:
             print(f"FINDSTR: Invalid regular expression: {e}")
+            return
+        
+        # Collect the matches and write them in one call
+        lines = input_text.split('\n')
+        if '/N' in options:
+            out = [f"{line_num}:{line}\n" for line_num, line in enumerate(lines, 1)
+                   if search(line)]
+        else:
+            out = [line + '\n' for line in lines if search(line)]
+        sys.stdout.write(''.join(out))
 
 # Enhanced command implementations that work with pipes
 class PipeAwareCommands:
@@ -371,13 +419,19 @@ def integrate_pipeline_support(command_processor):
         
         def enhanced_process_command_with_pipes(command_line):
             """Enhanced command processing with full pipeline and redirection support"""
-            # Check for pipes first
-            if '|' in command_line:
+            # Compound commands are split first; each part comes back through here
+            if command_processor.is_compound_command(command_line):
+                return command_processor._original_process_command_pipe(command_line)
+            
+            # One scan finds every operator; pipes take precedence
+            operators = _find_operators(command_line)
+            if '|' in operators:
                 return enhanced_processor.pipeline_processor.process_pipeline(command_line)
             
             # Check for redirection
-            if any(redirect in command_line for redirect in ['>', '<', '2>', '2>&1']):
-                return enhanced_processor.redirection_processor.process_redirection(command_line)
+            if operators:
+                return enhanced_processor.redirection_processor.process_redirection(
+                    command_line, operators)
             
             # Regular command processing using original method
             return command_processor._original_process_command_pipe(command_line)
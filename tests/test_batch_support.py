@@ -0,0 +1,118 @@
+"""
+Tests for batch file IF and CALL handling
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from batch_support import BatchProcessor, compile_batch
+
+
+class _RecordingProcessor:
+    """Command processor stand-in that records the commands it is given"""
+    
+    def __init__(self):
+        self.commands = []
+    
+    def process_command(self, command_line):
+        self.commands.append(command_line)
+        return None
+
+
+class HandleIfTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.processor = _RecordingProcessor()
+        self.batch = BatchProcessor(self.processor)
+    
+    def run_if(self, condition):
+        """Run IF with the given condition; returns the commands it ran"""
+        self.processor.commands = []
+        self.batch.handle_if(condition.split(), None)
+        return self.processor.commands
+    
+    def test_string_compare(self):
+        self.assertEqual(self.run_if('"a"=="a" dir /b'), ['dir /b'])
+        self.assertEqual(self.run_if('a==b dir'), [])
+    
+    def test_not_inverts_compare(self):
+        self.assertEqual(self.run_if('NOT a==b dir'), ['dir'])
+        self.assertEqual(self.run_if('not a==a vol'), [])
+    
+    def test_not_inverts_exist(self):
+        self.assertEqual(self.run_if('NOT EXIST no_such_file.txt dir'), ['dir'])
+        self.assertEqual(self.run_if(f'NOT EXIST {__file__} vol'), [])
+    
+    def test_defined(self):
+        self.batch._set('BATCHVAR', '1')
+        os.environ['BATCH_SUPPORT_TEST_VAR'] = '1'
+        try:
+            self.assertEqual(self.run_if('DEFINED BATCHVAR dir'), ['dir'])
+            self.assertEqual(self.run_if('DEFINED BATCH_SUPPORT_TEST_VAR vol'), ['vol'])
+            self.assertEqual(self.run_if('DEFINED NO_SUCH_BATCH_VARIABLE ver'), [])
+            self.assertEqual(self.run_if('NOT DEFINED NO_SUCH_BATCH_VARIABLE cls'), ['cls'])
+        finally:
+            del os.environ['BATCH_SUPPORT_TEST_VAR']
+    
+    def test_goto_inside_if_jumps(self):
+        program = compile_batch([
+            '@echo off\n',
+            'if a==a goto skip\n',
+            'echo not skipped\n',
+            ':skip\n',
+            'echo done\n',
+        ])
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.batch.execute_batch_lines(program, None)
+        self.assertEqual(out.getvalue(), 'done\n')
+
+
+class CallTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.batch = BatchProcessor(_RecordingProcessor())
+    
+    def run_batch(self, lines, *args):
+        """Run a batch file made of lines; returns what it printed"""
+        path = os.path.join(self.directory, 'test.bat')
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.batch.execute_batch_file(path, [path, *args])
+        return out.getvalue()
+    
+    def test_set_in_subroutine_is_visible_to_caller(self):
+        out = self.run_batch([
+            '@echo off',
+            'call :setit',
+            'echo result=%X%',
+            'goto end',
+            ':setit',
+            'set X=hello',
+            ':end',
+        ])
+        self.assertEqual(out, 'result=hello\n')
+    
+    def test_parameters_are_restored_after_subroutine(self):
+        out = self.run_batch([
+            '@echo off',
+            'call :show two',
+            'echo %1',
+            'goto end',
+            ':show',
+            'echo %1',
+            ':end',
+        ], 'one')
+        self.assertEqual(out, 'two\none\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
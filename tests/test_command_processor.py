@@ -0,0 +1,114 @@
+"""
+Tests for command chaining, PATH lookup and variable lookup
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from command_processor import CommandProcessor
+
+
+class _PlainProcessor(CommandProcessor):
+    """CommandProcessor without the pipeline and DOSKEY integrations"""
+    
+    def _initialize_integrations(self):
+        pass
+
+
+class CompoundCommandTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.processor = _PlainProcessor()
+    
+    def run_line(self, command_line):
+        """Run a command line; returns what it printed"""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.processor.process_command(command_line)
+        return out.getvalue()
+    
+    def test_and_runs_after_success(self):
+        self.assertEqual(self.run_line('echo one && echo two'), 'one\ntwo\n')
+    
+    def test_or_skipped_after_success(self):
+        self.assertEqual(self.run_line('echo one || echo two'), 'one\n')
+    
+    def test_and_skipped_after_unknown_command(self):
+        out = self.run_line('no_such_command_for_tests && echo two')
+        self.assertNotIn('two', out)
+        self.assertEqual(self.processor.errorlevel, 9009)
+    
+    def test_or_runs_after_unknown_command(self):
+        out = self.run_line('no_such_command_for_tests || echo two')
+        self.assertTrue(out.endswith('two\n'))
+        self.assertEqual(self.processor.errorlevel, 0)
+    
+    def test_and_skipped_after_failing_exit_code(self):
+        failing = f'{sys.executable} -c "raise SystemExit(3)"'
+        self.assertEqual(self.run_line(f'{failing} && echo two'), '')
+        self.assertEqual(self.processor.errorlevel, 3)
+        self.assertEqual(self.run_line(f'{failing} || echo two'), 'two\n')
+    
+    def test_ampersand_always_runs(self):
+        out = self.run_line('no_such_command_for_tests & echo two')
+        self.assertTrue(out.endswith('two\n'))
+
+
+class FindExecutableTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        path = os.environ.get('PATH', '')
+        os.environ['PATH'] = self.directory + os.pathsep + path
+        self.addCleanup(os.environ.__setitem__, 'PATH', path)
+        self.processor = _PlainProcessor()
+    
+    def install(self, name):
+        full_path = os.path.join(self.directory, name)
+        with open(full_path, 'w') as f:
+            f.write('')
+        os.chmod(full_path, 0o755)
+        # Make sure the directory looks changed even on coarse timestamps
+        st = os.stat(self.directory)
+        os.utime(self.directory, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        return full_path
+    
+    def test_tool_installed_after_a_miss_is_found(self):
+        self.assertIsNone(self.processor.find_executable('late_tool'))
+        full_path = self.install('late_tool')
+        self.assertEqual(self.processor.find_executable('late_tool'), full_path)
+    
+    @unittest.skipUnless(os.name == 'nt', 'names are case-sensitive here')
+    def test_lookup_ignores_case(self):
+        self.install('Tool.exe')
+        self.assertIsNotNone(self.processor.find_executable('TOOL.EXE'))
+        self.assertIsNotNone(self.processor.find_executable('tool.exe'))
+
+
+class LookupVariableTests(unittest.TestCase):
+    
+    def setUp(self):
+        os.environ['Lookup_Test_Old'] = 'old'
+        self.addCleanup(os.environ.pop, 'Lookup_Test_Old', None)
+        self.addCleanup(os.environ.pop, 'Lookup_Test_New', None)
+        self.processor = _PlainProcessor()
+    
+    def test_name_case_is_ignored(self):
+        self.assertEqual(self.processor.lookup_variable('LOOKUP_TEST_OLD'), 'old')
+    
+    def test_variable_added_after_a_delete_is_found(self):
+        self.processor.lookup_variable('LOOKUP_TEST_OLD')
+        del os.environ['Lookup_Test_Old']
+        os.environ['Lookup_Test_New'] = 'new'
+        self.assertEqual(self.processor.lookup_variable('LOOKUP_TEST_NEW'), 'new')
+        self.assertIsNone(self.processor.lookup_variable('LOOKUP_TEST_OLD'))
+
+
+if __name__ == '__main__':
+    unittest.main()
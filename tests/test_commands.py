@@ -0,0 +1,43 @@
+"""
+Tests for the built-in commands
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from commands import _copy_tree
+
+
+class CopyTreeTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+        os.makedirs(os.path.join('src', 'd'))
+        for path in ('a.txt', os.path.join('d', 'b.txt')):
+            with open(os.path.join('src', path), 'w') as f:
+                f.write(path)
+    
+    def listing(self, root):
+        return sorted(os.path.relpath(os.path.join(d, n), root)
+                      for d, dirs, files in os.walk(root) for n in dirs + files)
+    
+    def test_copy_into_a_subdirectory_of_the_source(self):
+        dest = os.path.join('src', 'sub')
+        self.assertEqual(_copy_tree('src', dest), 2)
+        self.assertEqual(self.listing(dest), ['a.txt', 'd', os.path.join('d', 'b.txt')])
+    
+    def test_repeated_copy_does_not_nest_the_destination(self):
+        dest = os.path.join('src', 'sub')
+        _copy_tree('src', dest)
+        self.assertEqual(_copy_tree('src', dest), 2)
+        self.assertEqual(self.listing(dest), ['a.txt', 'd', os.path.join('d', 'b.txt')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for DOSKEY history persistence
+"""
+
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from contextlib import redirect_stdout
+
+from doskey_support import DoskeyProcessor, _history_frame
+
+
+class _TempDoskey(DoskeyProcessor):
+    """DoskeyProcessor keeping its files in a test directory"""
+    
+    directory = None
+    
+    def get_history_file(self):
+        return Path(self.directory) / 'history.bin'
+    
+    def get_macro_file(self):
+        return Path(self.directory) / 'macros.json'
+
+
+class _CountingDoskey(_TempDoskey):
+    """Records every descriptor opened on the history log"""
+    
+    def _open_history_log(self):
+        super()._open_history_log()
+        self.opened = getattr(self, 'opened', []) + [self._hfd]
+
+
+class HistoryFileTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        _TempDoskey.directory = self.directory
+        self.history_file = Path(self.directory) / 'history.bin'
+    
+    def make_processor(self, max_history=50, cls=_TempDoskey):
+        processor = cls(max_history)
+        self.addCleanup(processor.close)
+        return processor
+    
+    def test_history_round_trip(self):
+        processor = self.make_processor()
+        processor.add_command('dir')
+        processor.add_command('echo héllo')
+        processor.close()
+        self.assertEqual(self.make_processor().get_history(), ['dir', 'echo héllo'])
+    
+    def test_compacting_load_opens_one_log(self):
+        # More than 2 x max_history frames makes load_history compact the log
+        self.history_file.write_bytes(b''.join(_history_frame(f'cmd {i}') for i in range(12)))
+        processor = self.make_processor(max_history=5, cls=_CountingDoskey)
+        self.assertEqual(processor.opened, [processor._hfd])
+        self.assertEqual(processor.get_history(), [f'cmd {i}' for i in range(7, 12)])
+    
+    def test_imports_legacy_json_history_once(self):
+        legacy = Path(self.directory) / 'command_history.json'
+        legacy.write_text(json.dumps(['cd \\', 'dir /w', 'ver']), encoding='utf-8')
+        
+        processor = self.make_processor()
+        self.assertEqual(processor.get_history(), ['cd \\', 'dir /w', 'ver'])
+        processor.add_command('cls')
+        processor.close()
+        
+        # history.bin now exists, so the JSON file is not imported again
+        self.assertTrue(self.history_file.exists())
+        self.assertEqual(self.make_processor().get_history(), ['cd \\', 'dir /w', 'ver', 'cls'])
+
+
+
+class MacroFileTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        _TempDoskey.directory = self.directory
+        self.processor = _TempDoskey()
+        self.addCleanup(self.processor.close)
+    
+    def load(self, text):
+        path = Path(self.directory) / 'macros.txt'
+        path.write_text(text, encoding='utf-8')
+        with redirect_stdout(io.StringIO()):
+            self.processor.load_macro_file(str(path))
+    
+    def test_loads_definitions_and_skips_other_lines(self):
+        self.load('ll=dir /w $*\n\nnot a definition\ngo=cd $1\n')
+        self.assertEqual(self.processor.list_macros(), {'ll': 'dir /w $*', 'go': 'cd $1'})
+    
+    def test_names_starting_with_hash_or_semicolon_are_macros(self):
+        self.load('#h=help\n;v=ver\n')
+        self.assertEqual(self.processor.list_macros(), {'#h': 'help', ';v': 'ver'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the extended command set
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from full_commands import PassthroughCommand, ReplaceCommand, RobocopyCommand
+
+
+class PassthroughCommandTests(unittest.TestCase):
+    
+    def test_arguments_reach_the_tool_unchanged(self):
+        expected = ['a; echo hi', '$(id)', 'x | y', 'two words']
+        check = f'import sys; sys.exit(sys.argv[1:] != {expected!r})'
+        command = PassthroughCommand(sys.executable)
+        self.assertEqual(command.execute(['-c', check, *expected]), 0)
+    
+    def test_exit_code_is_returned(self):
+        command = PassthroughCommand(sys.executable)
+        self.assertEqual(command.execute(['-c', 'raise SystemExit(127)']), 127)
+
+
+class CopyOntoSourceTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+    
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def run_command(self, command, args):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            command.execute(args)
+        return out.getvalue()
+    
+    def test_replace_onto_itself_keeps_contents(self):
+        self.write('a.txt', b'keep me')
+        out = self.run_command(ReplaceCommand(), ['a.txt', '.'])
+        self.assertEqual(self.read('a.txt'), b'keep me')
+        self.assertIn('same file', out)
+    
+    def test_robocopy_onto_source_keeps_contents(self):
+        self.write(os.path.join('src', 'a.txt'), b'first')
+        self.write(os.path.join('src', 'sub', 'b.txt'), b'second' * 100000)
+        out = self.run_command(RobocopyCommand(), ['src', 'src'])
+        self.assertEqual(self.read(os.path.join('src', 'a.txt')), b'first')
+        self.assertEqual(self.read(os.path.join('src', 'sub', 'b.txt')), b'second' * 100000)
+        self.assertIn('same file', out)
+    
+    def test_replace_copies_contents(self):
+        self.write('a.txt', b'new')
+        self.write(os.path.join('dest', 'a.txt'), b'old')
+        self.run_command(ReplaceCommand(), ['a.txt', 'dest'])
+        self.assertEqual(self.read(os.path.join('dest', 'a.txt')), b'new')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for pipelines and redirection
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from pipe_support import PipelineProcessor, RedirectionProcessor
+
+
+class _ScriptedProcessor:
+    """Command processor stand-in with a few stream-based commands"""
+    
+    def __init__(self):
+        self.commands = []
+    
+    def process_command(self, command_line):
+        self.commands.append(command_line)
+        name, _, arg = command_line.partition(' ')
+        if name == 'echo':
+            print(arg)
+        elif name == 'warn':
+            sys.stderr.write(arg + '\n')
+        elif name == 'lines':
+            for i in range(int(arg)):
+                print(f'line {i}')
+        elif name == 'upper':
+            sys.stdout.write(sys.stdin.read().upper())
+        elif name == 'count':
+            print(len(sys.stdin.read().splitlines()))
+        elif name == 'tee':
+            # Points stdout at a file while reading, the way
+            # CommandProcessor's > redirection does
+            with open(arg, 'w', encoding='utf-8') as f, redirect_stdout(f):
+                data = sys.stdin.read()
+                print(data, end='')
+            sys.stdout.write(data)
+
+
+class PipelineTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.processor = _ScriptedProcessor()
+        self.pipeline = PipelineProcessor(self.processor)
+    
+    def run_pipeline(self, command_line):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.pipeline.process_pipeline(command_line)
+        return out.getvalue()
+    
+    def test_stages_feed_each_other_in_order(self):
+        self.assertEqual(self.run_pipeline('lines 2 | upper'), 'LINE 0\nLINE 1\n')
+        self.assertEqual(self.run_pipeline('lines 500 | upper | count'), '500\n')
+        self.assertEqual(self.processor.commands,
+                         ['lines 2', 'upper', 'lines 500', 'upper', 'count'])
+    
+    def test_stage_redirecting_stdout_does_not_leak(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        copy = os.path.join(directory, 'copy.txt')
+        stdin = sys.stdin
+        
+        self.assertEqual(self.run_pipeline(f'lines 20000 | tee {copy} | count'), '20000\n')
+        with open(copy, encoding='utf-8') as f:
+            self.assertEqual(f.read(), ''.join(f'line {i}\n' for i in range(20000)))
+        self.assertIs(sys.stdin, stdin)
+
+
+class RedirectionTests(unittest.TestCase):
+    
+    def setUp(self):
+        self.processor = _ScriptedProcessor()
+        self.redirection = RedirectionProcessor(self.processor)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+    
+    def path(self, name):
+        return os.path.join(self.directory, name)
+    
+    def read(self, name):
+        with open(self.path(name), encoding='utf-8') as f:
+            return f.read()
+    
+    def test_digit_before_gt_inside_a_word_is_text(self):
+        self.redirection.process_redirection(f'echo abc2>{self.path("out.txt")}')
+        self.assertEqual(self.processor.commands, ['echo abc2'])
+        self.assertEqual(self.read('out.txt'), 'abc2\n')
+    
+    def test_stderr_redirect_after_whitespace(self):
+        self.redirection.process_redirection(f'warn oops 2> {self.path("err.txt")}')
+        self.assertEqual(self.processor.commands, ['warn oops'])
+        self.assertEqual(self.read('err.txt'), 'oops\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,79 @@ import os
 import sys
 import re
 import glob
+import stat
+import fnmatch
 import shutil
+import ctypes
+import datetime
+import platform
+import functools
 from pathlib import Path
 
+# A word is a run of quoted sections and other non-space characters; an
+# unterminated quote runs to the end of the line
+_WORD_RE = re.compile(r'''(?:"[^"]*"?|'[^']*'?|[^ "'])+''')
+_QUOTED_RE = re.compile(r'''"([^"]*)"?|'([^']*)'?''')
+
+# Size units and their divisors, indexed by bit_length() // 10
+_SIZE_UNITS = ("bytes", "KB", "MB", "GB", "TB")
+_SIZE_DIVISORS = (1, 1 << 10, 1 << 20, 1 << 30, 1 << 40)
+
+# Characters and device names Windows does not allow in file names
+_INVALID_CHARS_RE = re.compile(r'[<>:"|?*\x00]')
+_RESERVED_NAMES = frozenset({
+    'CON', 'PRN', 'AUX', 'NUL',
+    *(f'COM{i}' for i in range(1, 10)),
+    *(f'LPT{i}' for i in range(1, 10)),
+})
+
+# Each CMD metacharacter maps to its caret-escaped form
+_ESCAPE_TABLE = str.maketrans({c: '^' + c for c in '&<>|^'})
+
+# Last environment snapshot and its formatted block, for get_environment_block
+_env_cache = {'items': None, 'block': ()}
+
+_fromtimestamp = datetime.datetime.fromtimestamp
+
+def _has_wildcard(text):
+    """Check whether a path component contains glob wildcards"""
+    return '*' in text or '?' in text or '[' in text
+
+def _unquote(match):
+    """Replace a quoted section with its contents"""
+    return match.group(1) or match.group(2) or ''
+
+@functools.lru_cache(maxsize=4)
+def _parse_pathext(pathext):
+    """PATHEXT as a tuple of lowercase extensions, ready for str.endswith"""
+    # Empty entries (e.g. a trailing ';') would match every command
+    return tuple(ext for ext in pathext.lower().split(';') if ext)
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_path(cwd, path_str):
+    """Resolve path_str against cwd; depends only on its arguments, so
+    repeated tokens are answered from the cache"""
+    # Convert forward slashes to backslashes on Windows
+    if os.name == 'nt':
+        path_str = path_str.replace('/', '\\')
+    
+    # Resolve relative paths
+    if not os.path.isabs(path_str):
+        path_str = os.path.join(cwd, path_str)
+    
+    return os.path.normpath(path_str)
+
+@functools.lru_cache(maxsize=1)
+def _is_admin():
+    """Administrator status; it cannot change while the process runs"""
+    try:
+        if os.name == 'nt':
+            return ctypes.windll.shell32.IsUserAnAdmin()
+        else:
+            return os.geteuid() == 0
+    except:
+        return False
+
 class Utils:
     """Utility functions for the command prompt clone"""
     
@@ -18,22 +88,37 @@ class Utils:
         if size_bytes == 0:
             return "0 bytes"
         
-        size_names = ["bytes", "KB", "MB", "GB", "TB"]
+        # Every 10 bits is one more factor of 1024, so the unit comes straight
+        # from the bit length rather than a divide-and-compare loop
         i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
+        if size_bytes >= 1024:
+            i = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
         
-        return f"{size_bytes:.1f} {size_names[i]}"
+        return f"{size_bytes / _SIZE_DIVISORS[i]:.1f} {_SIZE_UNITS[i]}"
     
     @staticmethod
     def expand_wildcards(pattern):
         """Expand wildcard patterns like *.txt"""
+        directory, name = os.path.split(pattern)
+        if not _has_wildcard(name) or _has_wildcard(directory):
+            try:
+                matches = glob.glob(pattern)
+                return matches if matches else [pattern]
+            except:
+                return [pattern]
+        
+        # Single-directory pattern such as *.txt: one scandir plus fnmatch
         try:
-            matches = glob.glob(pattern)
-            return matches if matches else [pattern]
-        except:
+            with os.scandir(directory or '.') as it:
+                names = [e.name for e in it]
+        except OSError:
             return [pattern]
+        
+        # Like glob, wildcards do not match names starting with a dot
+        if not name.startswith('.'):
+            names = [n for n in names if not n.startswith('.')]
+        matches = fnmatch.filter(names, name)
+        return [os.path.join(directory, n) for n in matches] or [pattern]
     
     @staticmethod
     def is_hidden_file(filepath):
@@ -46,25 +131,32 @@ class Utils:
             return os.path.basename(filepath).startswith('.')
     
     @staticmethod
-    def get_file_attributes(filepath):
-        """Get file attributes string (like attrib command)"""
+    def get_file_attributes(filepath, st=None):
+        """Get file attributes string (like attrib command); pass st (for
+        example DirEntry.stat()) to reuse a stat the caller already has"""
         try:
-            path = Path(filepath)
+            if st is None:
+                st = os.stat(filepath)
             attrs = []
             
-            if path.is_dir():
+            if stat.S_ISDIR(st.st_mode):
                 attrs.append('D')
             else:
                 attrs.append(' ')
                 
-            # Check if file is read-only
+            # Check if file is read-only; os.access honours ownership and ACLs
             if not os.access(filepath, os.W_OK):
                 attrs.append('R')
             else:
                 attrs.append(' ')
                 
-            # Check if hidden
-            if Utils.is_hidden_file(filepath):
+            # Check if hidden: the Windows attribute, else a Unix dot file
+            file_attributes = getattr(st, 'st_file_attributes', None)
+            if file_attributes is not None:
+                hidden = file_attributes & stat.FILE_ATTRIBUTE_HIDDEN
+            else:
+                hidden = os.path.basename(filepath).startswith('.')
+            if hidden:
                 attrs.append('H')
             else:
                 attrs.append(' ')
@@ -88,18 +180,12 @@ class Utils:
         # Handle quotes
         path_str = path_str.strip('"\'')
         
-        # Expand environment variables
-        path_str = os.path.expandvars(path_str)
-        
-        # Convert forward slashes to backslashes on Windows
-        if os.name == 'nt':
-            path_str = path_str.replace('/', '\\')
+        # Expand environment variables; these can change, so they are
+        # expanded before the cache rather than inside it
+        if '$' in path_str or '%' in path_str:
+            path_str = os.path.expandvars(path_str)
         
-        # Resolve relative paths
-        if not os.path.isabs(path_str):
-            path_str = os.path.join(os.getcwd(), path_str)
-        
-        return os.path.normpath(path_str)
+        return _normalize_path(os.getcwd(), path_str)
     
     @staticmethod
     def get_disk_usage(path='.'):
@@ -117,21 +203,14 @@ class Utils:
     @staticmethod
     def validate_filename(filename):
         """Validate filename for Windows compatibility"""
-        invalid_chars = '<>:"|?*\x00'
-        invalid_names = [
-            'CON', 'PRN', 'AUX', 'NUL',
-            'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
-            'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9'
-        ]
-        
         # Check for invalid characters
-        for char in invalid_chars:
-            if char in filename:
-                return False, f"Invalid character '{char}' in filename"
+        match = _INVALID_CHARS_RE.search(filename)
+        if match:
+            return False, f"Invalid character '{match.group()}' in filename"
         
         # Check for reserved names
         name_only = os.path.splitext(filename)[0].upper()
-        if name_only in invalid_names:
+        if name_only in _RESERVED_NAMES:
             return False, f"'{filename}' is a reserved filename"
         
         # Check length
@@ -149,12 +228,16 @@ class Utils:
         """Get list of available drives"""
         drives = []
         if os.name == 'nt':
-            # Windows
-            import string
-            for letter in string.ascii_uppercase:
-                drive = f"{letter}:\\"
-                if os.path.exists(drive):
-                    drives.append(drive)
+            # Windows: one bitmask of present drives, bit 0 being A:
+            try:
+                mask = ctypes.windll.kernel32.GetLogicalDrives()
+                drives = [f"{chr(65 + i)}:\\" for i in range(26) if mask & (1 << i)]
+            except Exception:
+                import string
+                for letter in string.ascii_uppercase:
+                    drive = f"{letter}:\\"
+                    if os.path.exists(drive):
+                        drives.append(drive)
         else:
             # Unix-like systems
             drives = ['/']
@@ -170,59 +253,28 @@ class Utils:
     @staticmethod
     def escape_special_chars(text):
         """Escape special characters for command line"""
-        special_chars = '&<>|^'
-        for char in special_chars:
-            text = text.replace(char, f'^{char}')
-        return text
+        return text.translate(_ESCAPE_TABLE)
     
     @staticmethod
     def split_command_line(command_line):
         """Split command line respecting quotes and escapes"""
+        # One regex scan finds the words; only quoted ones need rewriting
         parts = []
-        current_part = ""
-        in_quotes = False
-        quote_char = None
-        i = 0
-        
-        while i < len(command_line):
-            char = command_line[i]
-            
-            if not in_quotes:
-                if char in ['"', "'"]:
-                    in_quotes = True
-                    quote_char = char
-                elif char == ' ':
-                    if current_part:
-                        parts.append(current_part)
-                        current_part = ""
-                else:
-                    current_part += char
-            else:
-                if char == quote_char:
-                    in_quotes = False
-                    quote_char = None
-                else:
-                    current_part += char
-            
-            i += 1
-        
-        if current_part:
-            parts.append(current_part)
-        
+        for word in _WORD_RE.findall(command_line):
+            if '"' in word or "'" in word:
+                word = _QUOTED_RE.sub(_unquote, word)
+            if word:
+                parts.append(word)
         return parts
     
     @staticmethod
     def format_file_time(timestamp):
         """Format file timestamp like DIR command"""
-        import datetime
-        dt = datetime.datetime.fromtimestamp(timestamp)
-        return dt.strftime('%m/%d/%Y  %I:%M %p')
+        return _fromtimestamp(timestamp).strftime('%m/%d/%Y  %I:%M %p')
     
     @staticmethod
     def get_system_info():
         """Get basic system information"""
-        import platform
-        
         info = {
             'os_name': platform.system(),
             'os_version': platform.version(),
@@ -236,22 +288,17 @@ class Utils:
     @staticmethod
     def check_admin_rights():
         """Check if running with administrator rights"""
-        try:
-            if os.name == 'nt':
-                import ctypes
-                return ctypes.windll.shell32.IsUserAnAdmin()
-            else:
-                return os.geteuid() == 0
-        except:
-            return False
+        return _is_admin()
     
     @staticmethod
     def get_environment_block():
         """Get environment variables in CMD format"""
-        env_block = []
-        for key, value in sorted(os.environ.items()):
-            env_block.append(f"{key}={value}")
-        return env_block
+        # Sort and format only when the environment has changed
+        items = tuple(os.environ.items())
+        if items != _env_cache['items']:
+            _env_cache['items'] = items
+            _env_cache['block'] = tuple(f"{key}={value}" for key, value in sorted(items))
+        return list(_env_cache['block'])
     
     @staticmethod
     def resolve_path_extensions(command):
@@ -259,11 +306,24 @@ class Utils:
         if os.name != 'nt':
             return command
         
-        pathext = os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD')
-        extensions = pathext.lower().split(';')
+        extensions = _parse_pathext(os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD'))
         
         # If command already has an extension, return as-is
-        if any(command.lower().endswith(ext) for ext in extensions):
+        if command.lower().endswith(extensions):
+            return command
+        
+        directory, name = os.path.split(command)
+        if directory:
+            # One listing of the directory instead of a stat per extension
+            try:
+                with os.scandir(directory) as it:
+                    files = {e.name.lower() for e in it if e.is_file()}
+            except OSError:
+                return command
+            name = name.lower()
+            for ext in extensions:
+                if name + ext in files:
+                    return command + ext
             return command
         
         # Try each extension